@@ -1,38 +1,87 @@
 from __future__ import annotations
 
 import abc
+import os
+import signal
+import socket
+import sys
+import threading
 import time
-import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 
 import structlog
 
 from shared.config_loader import load_pipeline_config
-from shared.elasticsearch_client import get_es_client, log_activity
+from shared.elasticsearch_client import ActivityLogBuffer, get_es_client
 from shared.logging_config import setup_logging
 from shared.models import ActivityLog, AgentMessage, AgentMetrics, OllamaUsage, Story
-from shared.redis_client import dequeue_message, get_redis_client, publish_activity
+from shared.redis_client import (
+    ack_message,
+    claim_stale_messages,
+    dead_letter_message,
+    dequeue_batch,
+    ensure_consumer_group,
+    get_redis_client,
+    publish_activity,
+    publish_and_enqueue,
+    trim_acked,
+)
 
 
 class BaseAgent(abc.ABC):
     def __init__(self, agent_name: str, listen_queue: str):
         self.agent_name = agent_name
         self.listen_queue = listen_queue
-        self.logger: structlog.stdlib.BoundLogger = setup_logging(agent_name)
+        # Each agent type is one consumer group on its queue stream; the container is the consumer
+        self.consumer_name = socket.gethostname()
+        self.logger: structlog.typing.FilteringBoundLogger = setup_logging(agent_name)
         self.config = load_pipeline_config()
         self.redis = get_redis_client()
         self.es = get_es_client()
+        self.activity_logs = ActivityLogBuffer(self.es)
         self.timeout = self.config["pipeline"]["queue_timeout"]
         self.loop_interval = self.config["pipeline"]["agent_loop_interval"]
+        self.batch_size = self.config["pipeline"].get("batch_size", 16)
+        # Messages handled at once; generate() is I/O-bound so worker threads overlap LLM calls
+        self.concurrency = self.config["pipeline"].get("agent_concurrency", 1)
+        # Unacked messages are claimed again once idle this long, up to max_deliveries attempts
+        self.claim_idle = self.config["pipeline"].get("claim_idle", 1800)
+        self.max_deliveries = self.config["pipeline"].get("max_deliveries", 3)
+        # Entry ids submitted to the pool and not finished yet, so a claim never doubles one up
+        self._in_flight: set[str] = set()
+        self._stopping = threading.Event()
 
-    def log_activity(self, action: str, detail: str = "", story_id: str = "") -> None:
+    def log_activity(self, action: str, detail: str = "", story_id: str = "", **fields) -> None:
         entry = ActivityLog(
             agent_name=self.agent_name,
             story_id=story_id,
             action=action,
             detail=detail,
+            **fields,
         )
         publish_activity(self.redis, entry)
-        log_activity(self.es, entry)
+        self.activity_logs.add(entry)
+
+    def log_and_enqueue(
+        self,
+        queue: str,
+        message: AgentMessage,
+        action: str,
+        detail: str = "",
+        story_id: str = "",
+        **fields,
+    ) -> None:
+        """log_activity() followed by an enqueue, sharing one Redis round-trip."""
+        entry = ActivityLog(
+            agent_name=self.agent_name,
+            story_id=story_id,
+            action=action,
+            detail=detail,
+            **fields,
+        )
+        publish_and_enqueue(self.redis, entry, queue, message)
+        self.activity_logs.add(entry)
 
     def record_metrics(
         self,
@@ -52,33 +101,147 @@ class BaseAgent(abc.ABC):
             total_tokens=usage.total_tokens,
         )
         story.metrics.append(m)
-        story.total_duration_seconds = round(
-            sum(e.duration_seconds for e in story.metrics), 2
-        )
-        story.total_prompt_tokens = sum(e.prompt_tokens for e in story.metrics)
-        story.total_completion_tokens = sum(e.completion_tokens for e in story.metrics)
-        story.total_tokens = sum(e.total_tokens for e in story.metrics)
+        # Totals are running sums persisted on the story, so only add this entry's delta
+        story.total_duration_seconds = round(story.total_duration_seconds + m.duration_seconds, 2)
+        story.total_prompt_tokens += m.prompt_tokens
+        story.total_completion_tokens += m.completion_tokens
+        story.total_tokens += m.total_tokens
 
     @abc.abstractmethod
     def handle_message(self, message: AgentMessage) -> None:
         ...
 
     def run(self) -> None:
-        self.logger.info("agent_starting", queue=self.listen_queue)
+        # docker stop sends SIGTERM and SIGKILLs after a short grace period. Flush the
+        # buffered activity logs, then hard-exit: a normal interpreter exit joins the
+        # pool's threads, i.e. waits on in-flight LLM calls until the SIGKILL. Their
+        # messages are unacked and get claimed again on restart.
+        signal.signal(signal.SIGTERM, self._on_sigterm)
+        pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix=self.agent_name)
+        try:
+            self._run_loop(pool)
+        finally:
+            self.activity_logs.close()
+            if self._stopping.is_set():
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(0)
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _on_sigterm(self, signum, frame) -> None:
+        self._stopping.set()
+        # Raising in the main thread interrupts a blocking XREADGROUP or slot wait and
+        # unwinds to run(), so the flush doesn't run inside the handler while the main
+        # thread may hold the log buffer's lock
+        sys.exit(0)
+
+    def _run_loop(self, pool: ThreadPoolExecutor) -> None:
+        self.logger.info("agent_starting", queue=self.listen_queue, concurrency=self.concurrency)
         self.log_activity("agent_started", f"{self.agent_name} is online")
 
-        while True:
+        ensure_consumer_group(self.redis, self.listen_queue, self.agent_name)
+
+        # Each worker holds a slot for the duration of a message, so the loop stops
+        # pulling from Redis while every worker is busy.
+        slots = threading.BoundedSemaphore(self.concurrency)
+
+        # Start by claiming everything a previous run received but never acked
+        # (crashed mid-message or handler failed); after that only entries idle
+        # past claim_idle are retried, so in-flight LLM calls aren't taken over.
+        min_idle_ms = 0
+        next_claim = 0.0
+        while not self._stopping.is_set():
+            if time.monotonic() >= next_claim:
+                self._claim_stale(pool, slots, min_idle_ms)
+                self._trim_acked()
+                min_idle_ms = self.claim_idle * 1000
+                next_claim = time.monotonic() + self.timeout
+
             try:
-                message = dequeue_message(self.redis, self.listen_queue, timeout=self.timeout)
-                if message is None:
-                    continue
-                self.logger.info(
-                    "message_received",
-                    action=message.action,
-                    story_id=message.story_id,
+                entries = dequeue_batch(
+                    self.redis,
+                    self.listen_queue,
+                    self.agent_name,
+                    self.consumer_name,
+                    max_n=self.batch_size,
+                    timeout=self.timeout,
                 )
-                self.handle_message(message)
-            except Exception:
-                self.logger.error("agent_error", error=traceback.format_exc())
-                self.log_activity("error", traceback.format_exc())
+            except Exception as exc:
+                self._report_error(exc)
                 time.sleep(self.loop_interval)
+                continue
+
+            for entry_id, message in entries:
+                self._submit(pool, slots, entry_id, message)
+
+    def _claim_stale(self, pool: ThreadPoolExecutor, slots: threading.BoundedSemaphore, min_idle_ms: int) -> None:
+        """Retry unacked entries idle for min_idle_ms, dead-lettering those out of attempts."""
+        try:
+            claimed = claim_stale_messages(
+                self.redis,
+                self.listen_queue,
+                self.agent_name,
+                self.consumer_name,
+                min_idle_ms,
+                count=self.batch_size,
+            )
+        except Exception as exc:
+            self._report_error(exc)
+            return
+
+        for entry_id, message, deliveries in claimed:
+            if entry_id in self._in_flight:
+                continue
+            if deliveries > self.max_deliveries:
+                try:
+                    dead_letter_message(
+                        self.redis, self.listen_queue, self.agent_name, entry_id, message, deliveries
+                    )
+                except Exception as exc:
+                    self._report_error(exc)
+                    continue
+                self.log_activity(
+                    "message_dead_lettered",
+                    f"{message.action} failed {deliveries - 1} times, moved to the dead-letter queue",
+                    message.story_id,
+                )
+                continue
+            self._submit(pool, slots, entry_id, message)
+
+    def _trim_acked(self) -> None:
+        try:
+            trim_acked(self.redis, self.listen_queue, self.agent_name)
+        except Exception as exc:
+            self._report_error(exc)
+
+    def _submit(
+        self, pool: ThreadPoolExecutor, slots: threading.BoundedSemaphore, entry_id: str, message: AgentMessage
+    ) -> None:
+        slots.acquire()
+        self._in_flight.add(entry_id)
+        pool.submit(self._process_message, entry_id, message, slots)
+
+    def _process_message(
+        self, entry_id: str, message: AgentMessage, slots: threading.BoundedSemaphore
+    ) -> None:
+        try:
+            self.logger.info(
+                "message_received",
+                action=message.action,
+                story_id=message.story_id,
+            )
+            self.handle_message(message)
+            ack_message(self.redis, self.listen_queue, self.agent_name, entry_id)
+        except Exception as exc:
+            # Left unacked: _claim_stale retries it once it has been idle for claim_idle
+            self._report_error(exc)
+            time.sleep(self.loop_interval)
+        finally:
+            self._in_flight.discard(entry_id)
+            slots.release()
+
+    def _report_error(self, exc: Exception) -> None:
+        """Log the full traceback once and publish a short, correlatable activity entry."""
+        error_id = uuid.uuid4().hex[:12]
+        self.logger.exception("agent_error", error_id=error_id)
+        self.log_activity("error", f"{type(exc).__name__}: {exc} (error_id={error_id})")
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import re
 import time
+from itertools import islice
 
 from shared import constants
 from shared.svg_utils import sanitize_svg
@@ -9,10 +10,18 @@ from shared.config_loader import load_prompt
 from shared.elasticsearch_client import get_story, save_story
 from shared.models import AgentMessage, StoryStatus
 from shared.ollama_client import generate
-from shared.redis_client import enqueue_message
 
 from agents.base_agent import BaseAgent
 
+_WORD_RE = re.compile(r"\S+")
+
+
+def _first_n_words(text: str, n: int) -> tuple[str, bool]:
+    """Return the first n words of text and whether any words were cut off."""
+    words = _WORD_RE.finditer(text)
+    head = " ".join(m.group() for m in islice(words, n))
+    return head, next(words, None) is not None
+
 
 class CoverDesignerAgent(BaseAgent):
     def __init__(self):
@@ -38,8 +47,9 @@ class CoverDesignerAgent(BaseAgent):
         genre = story.prompt.genre if story.prompt else "fiction"
         theme = story.prompt.theme if story.prompt else ""
         # Use first ~200 words of draft as synopsis
-        draft_words = story.current_draft.split()
-        synopsis = " ".join(draft_words[:200]) + ("..." if len(draft_words) > 200 else "")
+        synopsis, truncated = _first_n_words(story.current_draft, 200)
+        if truncated:
+            synopsis += "..."
 
         user_prompt = (
             f"Design an SVG book cover for:\n\n"
@@ -59,14 +69,7 @@ class CoverDesignerAgent(BaseAgent):
         self.record_metrics(story, "design_cover", elapsed, result.usage)
         save_story(self.es, story)
 
-        self.log_activity(
-            "cover_designed",
-            f"Cover ready ({len(svg)} chars, {elapsed:.1f}s)",
-            story_id,
-        )
-
-        enqueue_message(
-            self.redis,
+        self.log_and_enqueue(
             constants.QUEUE_ORCHESTRATOR,
             AgentMessage(
                 story_id=story_id,
@@ -74,6 +77,9 @@ class CoverDesignerAgent(BaseAgent):
                 source=self.agent_name,
                 target="orchestrator",
             ),
+            "cover_designed",
+            f"Cover ready ({len(svg)} chars, {elapsed:.1f}s)",
+            story_id,
         )
 
     _FALLBACK_SVG = (
@@ -88,12 +94,12 @@ class CoverDesignerAgent(BaseAgent):
 
     def _extract_svg(self, text: str) -> str:
         """Extract the SVG element from LLM output and sanitize it."""
-        match = re.search(r"(<svg[\s\S]*?</svg>)", text)
-        if not match:
+        # Same match as the lazy regex <svg[\s\S]*?</svg>, done with two substring scans
+        start = text.find("<svg")
+        end = text.find("</svg>", start) if start >= 0 else -1
+        if end < 0:
             return self._FALLBACK_SVG
-        svg = match.group(1)
-        svg = sanitize_svg(svg)
-        return svg
+        return sanitize_svg(text[start:end + len("</svg>")])
 
 
 def main():
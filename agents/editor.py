@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import re
 import time
 
 from shared import constants
@@ -7,10 +8,12 @@ from shared.config_loader import load_prompt
 from shared.elasticsearch_client import get_story, save_story
 from shared.models import AgentMessage, FeedbackItem
 from shared.ollama_client import generate
-from shared.redis_client import enqueue_message
 
 from agents.base_agent import BaseAgent
 
+_APPROVED_RE = re.compile(r"APPROVED:\s*YES", re.IGNORECASE)
+_VERDICTS = {True: "Approved", False: "Changes requested"}
+
 
 class EditorAgent(BaseAgent):
     def __init__(self):
@@ -41,7 +44,7 @@ class EditorAgent(BaseAgent):
         elapsed = time.monotonic() - t0
 
         feedback_text = result.text
-        approved = "APPROVED: YES" in feedback_text.upper()
+        approved = bool(_APPROVED_RE.search(feedback_text))
 
         feedback_item = FeedbackItem(
             agent="editor",
@@ -53,14 +56,7 @@ class EditorAgent(BaseAgent):
         self.record_metrics(story, "edit", elapsed, result.usage, round_number)
         save_story(self.es, story)
 
-        self.log_activity(
-            "edit_complete",
-            f"Round {round_number} - {'Approved' if approved else 'Changes requested'}",
-            story_id,
-        )
-
-        enqueue_message(
-            self.redis,
+        self.log_and_enqueue(
             constants.QUEUE_ORCHESTRATOR,
             AgentMessage(
                 story_id=story_id,
@@ -73,6 +69,11 @@ class EditorAgent(BaseAgent):
                 source=self.agent_name,
                 target="orchestrator",
             ),
+            "edit_complete",
+            f"Round {round_number} - {_VERDICTS[approved]}",
+            story_id,
+            round_number=round_number,
+            approved=approved,
         )
 
 
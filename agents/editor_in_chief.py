@@ -4,16 +4,61 @@ import time
 import uuid
 from collections import deque
 
+from elasticsearch import ConflictError
+
 from shared import constants
 from shared.config_loader import load_prompt
-from shared.elasticsearch_client import get_story, list_in_progress_stories, save_story
+from shared.elasticsearch_client import (
+    get_story_with_version,
+    list_in_progress_stories,
+    save_story,
+    update_story_fields,
+)
 from shared.models import AgentMessage, Story, StoryStatus
 from shared.ollama_client import generate
-from shared.redis_client import enqueue_message
+from shared.redis_client import enqueue_message, outstanding_story_ids
 
 from agents.base_agent import BaseAgent
 
 
+class _StoryStore:
+    """Reads stories with their ES (seq_no, primary_term) and makes updates conditional on it.
+
+    Other agents write a story between any two orchestrator handlers, so every
+    read goes to ES. The version it returns guards the orchestrator's next
+    update: if another agent wrote the story in between, the update is retried
+    once at the current version. Only the orchestrator's own fields are sent,
+    so the other agent's changes are kept.
+    """
+
+    def __init__(self):
+        self._versions: dict[str, tuple[int, int]] = {}
+
+    def get(self, es, story_id: str) -> Story | None:
+        fetched = get_story_with_version(es, story_id)
+        if fetched is None:
+            self._versions.pop(story_id, None)
+            return None
+        story, seq_no, primary_term = fetched
+        self._versions[story_id] = (seq_no, primary_term)
+        return story
+
+    def save(self, es, story: Story) -> None:
+        self._versions[story.story_id] = save_story(es, story)
+
+    def update(self, es, story: Story, *fields: str) -> None:
+        sid = story.story_id
+        try:
+            self._versions[sid] = update_story_fields(es, story, *fields, version=self._versions.get(sid))
+        except ConflictError:
+            if self.get(es, sid) is None:
+                raise
+            self._versions[sid] = update_story_fields(es, story, *fields, version=self._versions[sid])
+
+    def evict(self, story_id: str) -> None:
+        self._versions.pop(story_id, None)
+
+
 class EditorInChiefAgent(BaseAgent):
     def __init__(self):
         super().__init__("orchestrator", constants.QUEUE_ORCHESTRATOR)
@@ -25,6 +70,21 @@ class EditorInChiefAgent(BaseAgent):
         self._story_queue: deque[AgentMessage] = deque()
         # Track pending reviews per story: {story_id: {"reviewer": ..., "editor": ...}}
         self._pending_feedback: dict[str, dict] = {}
+        # When each _pending_feedback entry was opened, for expiring abandoned rounds
+        self._pending_since: dict[str, float] = {}
+        self._feedback_ttl = self.config["pipeline"].get("feedback_ttl", 3600)
+        self._stories = _StoryStore()
+        # The state machine above is not thread-safe, so handle one message at a time
+        self.concurrency = 1
+        self._handlers = {
+            constants.ACTION_START_NEW_STORY: self._handle_start_new_story,
+            constants.ACTION_PROMPT_READY: self._handle_prompt_ready,
+            constants.ACTION_DRAFT_READY: self._handle_draft_ready,
+            constants.ACTION_REVIEW_COMPLETE: self._handle_review_complete,
+            constants.ACTION_EDIT_COMPLETE: self._handle_edit_complete,
+            constants.ACTION_REVISION_READY: self._handle_revision_ready,
+            constants.ACTION_COVER_READY: self._handle_cover_ready,
+        }
 
     # --- Restart recovery ---
 
@@ -38,6 +98,13 @@ class EditorInChiefAgent(BaseAgent):
             self.logger.info("recovery_skipped", reason="no in-progress stories")
             return
 
+        # Stories with an unacked message on any queue pick up from that message
+        # (replayed through the consumer groups), so re-dispatching them would
+        # run the same step twice.
+        pending: set[str] = set()
+        for queue, group in constants.QUEUE_GROUPS.items():
+            pending |= outstanding_story_ids(self.redis, queue, group)
+
         queued: list[Story] = []
         active: list[Story] = []
         for s in stories:
@@ -60,10 +127,15 @@ class EditorInChiefAgent(BaseAgent):
         # Restore active stories first (they keep their concurrency slots)
         for story in active:
             self._active_stories.add(story.story_id)
-            self._recover_story(story)
+            if story.story_id in pending:
+                self.log_activity("recovery_skipped", "Pending message will resume it", story.story_id)
+            else:
+                self._recover_story(story)
 
         # Restore queued stories: dispatch if slots available, else buffer
         for story in queued:
+            if story.story_id in pending:
+                continue  # its start_new_story is replayed and queued as usual
             msg = self._story_to_start_message(story)
             if len(self._active_stories) < self._max_concurrent:
                 self._dispatch_new_story(msg)
@@ -85,9 +157,7 @@ class EditorInChiefAgent(BaseAgent):
         status = story.status
 
         if status == StoryStatus.PROMPT_CREATED:
-            self.log_activity("recovery_dispatch", "Re-sending to writer", sid)
-            enqueue_message(
-                self.redis,
+            self.log_and_enqueue(
                 constants.QUEUE_WRITER,
                 AgentMessage(
                     story_id=sid,
@@ -95,31 +165,30 @@ class EditorInChiefAgent(BaseAgent):
                     source=self.agent_name,
                     target="writer",
                 ),
+                "recovery_dispatch",
+                "Re-sending to writer",
+                sid,
             )
 
         elif status == StoryStatus.DRAFT_WRITTEN:
-            story.status = StoryStatus.IN_REVIEW
-            save_story(self.es, story)
             round_number = story.revision_count + 1
             self.log_activity("recovery_dispatch", f"Draft written -> review round {round_number}", sid)
-            self._send_for_review(sid, round_number)
+            self._send_for_review(story, round_number)
 
         elif status == StoryStatus.IN_REVIEW:
             round_number = story.revision_count + 1
             self.log_activity("recovery_dispatch", f"Re-sending for review round {round_number}", sid)
-            self._send_for_review(sid, round_number)
+            self._send_for_review(story, round_number)
 
         elif status == StoryStatus.REVISION_NEEDED:
             round_number = story.revision_count + 1
             self.log_activity("recovery_dispatch", f"Revision needed -> re-sending for review round {round_number}", sid)
-            self._send_for_review(sid, round_number)
+            self._send_for_review(story, round_number)
 
         elif status == StoryStatus.REVISED:
-            story.status = StoryStatus.IN_REVIEW
-            save_story(self.es, story)
             round_number = story.revision_count + 1
             self.log_activity("recovery_dispatch", f"Revised -> review round {round_number}", sid)
-            self._send_for_review(sid, round_number)
+            self._send_for_review(story, round_number)
 
         elif status in (StoryStatus.APPROVED, StoryStatus.DESIGNING_COVER):
             self.log_activity("recovery_dispatch", "Re-sending for cover design", sid)
@@ -138,16 +207,7 @@ class EditorInChiefAgent(BaseAgent):
         )
 
     def handle_message(self, message: AgentMessage) -> None:
-        handlers = {
-            constants.ACTION_START_NEW_STORY: self._handle_start_new_story,
-            constants.ACTION_PROMPT_READY: self._handle_prompt_ready,
-            constants.ACTION_DRAFT_READY: self._handle_draft_ready,
-            constants.ACTION_REVIEW_COMPLETE: self._handle_review_complete,
-            constants.ACTION_EDIT_COMPLETE: self._handle_edit_complete,
-            constants.ACTION_REVISION_READY: self._handle_revision_ready,
-            constants.ACTION_COVER_READY: self._handle_cover_ready,
-        }
-        handler = handlers.get(message.action)
+        handler = self._handlers.get(message.action)
         if handler is None:
             self.logger.warning("unknown_action", action=message.action)
             return
@@ -169,7 +229,7 @@ class EditorInChiefAgent(BaseAgent):
                 max_revisions=self.config["pipeline"]["max_revisions"],
                 trigger_payload=message.payload,
             )
-            save_story(self.es, queued_story)
+            self._stories.save(self.es, queued_story)
             self.log_activity(
                 "story_queued",
                 f"Story {message.story_id} queued ({len(self._story_queue)} waiting, "
@@ -186,7 +246,6 @@ class EditorInChiefAgent(BaseAgent):
         model = message.payload.get("model", "")
         genre = message.payload.get("genre", "")
         self._active_stories.add(story_id)
-        self.log_activity("starting_story", f"Initiating new story {story_id}" + (f" (model={model})" if model else ""), story_id)
 
         payload = {}
         if user_prompt:
@@ -196,8 +255,7 @@ class EditorInChiefAgent(BaseAgent):
         if genre:
             payload["genre"] = genre
 
-        enqueue_message(
-            self.redis,
+        self.log_and_enqueue(
             constants.QUEUE_PROMPT_GENERATOR,
             AgentMessage(
                 story_id=story_id,
@@ -206,14 +264,14 @@ class EditorInChiefAgent(BaseAgent):
                 source=self.agent_name,
                 target="prompt_generator",
             ),
+            "starting_story",
+            f"Initiating new story {story_id}" + (f" (model={model})" if model else ""),
+            story_id,
         )
 
     def _handle_prompt_ready(self, message: AgentMessage) -> None:
         story_id = message.story_id
-        self.log_activity("prompt_received", f"Sending to writer", story_id)
-
-        enqueue_message(
-            self.redis,
+        self.log_and_enqueue(
             constants.QUEUE_WRITER,
             AgentMessage(
                 story_id=story_id,
@@ -221,33 +279,30 @@ class EditorInChiefAgent(BaseAgent):
                 source=self.agent_name,
                 target="writer",
             ),
+            "prompt_received",
+            "Sending to writer",
+            story_id,
         )
 
     def _handle_draft_ready(self, message: AgentMessage) -> None:
         story_id = message.story_id
-        story = get_story(self.es, story_id)
+        story = self._stories.get(self.es, story_id)
         if not story:
             self.logger.error("story_not_found", story_id=story_id)
             return
 
-        story.status = StoryStatus.IN_REVIEW
-        save_story(self.es, story)
-
         round_number = story.revision_count + 1
-        self._send_for_review(story_id, round_number)
+        self._send_for_review(story, round_number)
 
     def _handle_revision_ready(self, message: AgentMessage) -> None:
         story_id = message.story_id
-        story = get_story(self.es, story_id)
+        story = self._stories.get(self.es, story_id)
         if not story:
             self.logger.error("story_not_found", story_id=story_id)
             return
 
-        story.status = StoryStatus.IN_REVIEW
-        save_story(self.es, story)
-
         round_number = message.payload.get("round_number", story.revision_count) + 1
-        self._send_for_review(story_id, round_number)
+        self._send_for_review(story, round_number)
 
     def _handle_review_complete(self, message: AgentMessage) -> None:
         story_id = message.story_id
@@ -257,10 +312,8 @@ class EditorInChiefAgent(BaseAgent):
             self._handle_parallel_feedback(message, "reviewer")
         else:
             # Sequential: after reviewer, send to editor
-            self.log_activity("review_received", "Sending to editor", story_id)
             round_number = message.payload.get("round_number", 1)
-            enqueue_message(
-                self.redis,
+            self.log_and_enqueue(
                 constants.QUEUE_EDITOR,
                 AgentMessage(
                     story_id=story_id,
@@ -269,6 +322,9 @@ class EditorInChiefAgent(BaseAgent):
                     source=self.agent_name,
                     target="editor",
                 ),
+                "review_received",
+                "Sending to editor",
+                story_id,
             )
 
     def _handle_edit_complete(self, message: AgentMessage) -> None:
@@ -279,15 +335,14 @@ class EditorInChiefAgent(BaseAgent):
             self._handle_parallel_feedback(message, "editor")
         else:
             # Sequential: both review and edit are done, evaluate
-            story = get_story(self.es, story_id)
+            story = self._stories.get(self.es, story_id)
             if not story:
                 return
 
             round_number = message.payload.get("round_number", 1)
             # Collect feedback from this round
-            round_feedback = [f for f in story.feedback if f.round_number == round_number]
-            reviewer_fb = next((f for f in round_feedback if f.agent == "reviewer"), None)
-            editor_fb = next((f for f in round_feedback if f.agent == "editor"), None)
+            reviewer_fb = story.get_feedback(round_number, "reviewer")
+            editor_fb = story.get_feedback(round_number, "editor")
 
             self._evaluate_and_decide(
                 story,
@@ -300,23 +355,30 @@ class EditorInChiefAgent(BaseAgent):
 
     # --- Helper methods ---
 
-    def _send_for_review(self, story_id: str, round_number: int) -> None:
+    def _send_for_review(self, story: Story, round_number: int) -> None:
+        story_id = story.story_id
+        if story.status != StoryStatus.IN_REVIEW:
+            story.status = StoryStatus.IN_REVIEW
+            self._stories.update(self.es, story, "status")
+
         review_mode = self.config["pipeline"].get("review_mode", "sequential")
-        self.log_activity("sending_for_review", f"Round {round_number} ({review_mode})", story_id)
+        review_message = AgentMessage(
+            story_id=story_id,
+            action=constants.ACTION_REVIEW,
+            payload={"round_number": round_number},
+            source=self.agent_name,
+            target="reviewer",
+        )
+        self.log_and_enqueue(
+            constants.QUEUE_REVIEWER,
+            review_message,
+            "sending_for_review",
+            f"Round {round_number} ({review_mode})",
+            story_id,
+        )
 
         if review_mode == "parallel":
-            self._pending_feedback[story_id] = {}
-            enqueue_message(
-                self.redis,
-                constants.QUEUE_REVIEWER,
-                AgentMessage(
-                    story_id=story_id,
-                    action=constants.ACTION_REVIEW,
-                    payload={"round_number": round_number},
-                    source=self.agent_name,
-                    target="reviewer",
-                ),
-            )
+            self._open_pending_feedback(story_id)
             enqueue_message(
                 self.redis,
                 constants.QUEUE_EDITOR,
@@ -328,24 +390,11 @@ class EditorInChiefAgent(BaseAgent):
                     target="editor",
                 ),
             )
-        else:
-            # Sequential: reviewer first
-            enqueue_message(
-                self.redis,
-                constants.QUEUE_REVIEWER,
-                AgentMessage(
-                    story_id=story_id,
-                    action=constants.ACTION_REVIEW,
-                    payload={"round_number": round_number},
-                    source=self.agent_name,
-                    target="reviewer",
-                ),
-            )
 
     def _handle_parallel_feedback(self, message: AgentMessage, agent_type: str) -> None:
         story_id = message.story_id
         if story_id not in self._pending_feedback:
-            self._pending_feedback[story_id] = {}
+            self._open_pending_feedback(story_id)
 
         self._pending_feedback[story_id][agent_type] = message.payload
 
@@ -356,7 +405,7 @@ class EditorInChiefAgent(BaseAgent):
             return
 
         # Both done
-        story = get_story(self.es, story_id)
+        story = self._stories.get(self.es, story_id)
         if not story:
             return
 
@@ -369,7 +418,20 @@ class EditorInChiefAgent(BaseAgent):
             editor_feedback=fb["editor"].get("feedback", ""),
             round_number=round_number,
         )
-        del self._pending_feedback[story_id]
+        self._close_pending_feedback(story_id)
+
+    def _open_pending_feedback(self, story_id: str) -> None:
+        # Drop rounds whose other half never arrived (crashed agent, lost message)
+        cutoff = time.monotonic() - self._feedback_ttl
+        for sid in [sid for sid, since in self._pending_since.items() if since < cutoff]:
+            self.logger.warning("pending_feedback_expired", story_id=sid)
+            self._close_pending_feedback(sid)
+        self._pending_feedback[story_id] = {}
+        self._pending_since[story_id] = time.monotonic()
+
+    def _close_pending_feedback(self, story_id: str) -> None:
+        self._pending_feedback.pop(story_id, None)
+        self._pending_since.pop(story_id, None)
 
     def _evaluate_and_decide(
         self,
@@ -385,8 +447,6 @@ class EditorInChiefAgent(BaseAgent):
         # Both approve -> send for cover design
         if reviewer_approved and editor_approved:
             self.log_activity("story_approved", "Both reviewer and editor approved", story_id)
-            story.status = StoryStatus.APPROVED
-            save_story(self.es, story)
             self._send_for_cover_design(story)
             return
 
@@ -397,8 +457,6 @@ class EditorInChiefAgent(BaseAgent):
                 f"Approved after {round_number} rounds, sending for cover design",
                 story_id,
             )
-            story.status = StoryStatus.APPROVED
-            save_story(self.es, story)
             self._send_for_cover_design(story)
             return
 
@@ -415,13 +473,19 @@ class EditorInChiefAgent(BaseAgent):
         elapsed = time.monotonic() - t0
         self.record_metrics(story, "evaluate_feedback", elapsed, result.usage, round_number)
 
-        self.log_activity("revision_needed", f"Round {round_number} - requesting revision", story_id)
-
         story.status = StoryStatus.REVISION_NEEDED
-        save_story(self.es, story)
+        self._stories.update(
+            self.es,
+            story,
+            "status",
+            "metrics",
+            "total_duration_seconds",
+            "total_prompt_tokens",
+            "total_completion_tokens",
+            "total_tokens",
+        )
 
-        enqueue_message(
-            self.redis,
+        self.log_and_enqueue(
             constants.QUEUE_WRITER,
             AgentMessage(
                 story_id=story_id,
@@ -433,17 +497,17 @@ class EditorInChiefAgent(BaseAgent):
                 source=self.agent_name,
                 target="writer",
             ),
+            "revision_needed",
+            f"Round {round_number} - requesting revision",
+            story_id,
         )
 
     def _send_for_cover_design(self, story) -> None:
         story_id = story.story_id
-        self.log_activity("sending_for_cover", "Sending to cover designer", story_id)
-
         story.status = StoryStatus.DESIGNING_COVER
-        save_story(self.es, story)
+        self._stories.update(self.es, story, "status")
 
-        enqueue_message(
-            self.redis,
+        self.log_and_enqueue(
             constants.QUEUE_COVER_DESIGNER,
             AgentMessage(
                 story_id=story_id,
@@ -451,11 +515,14 @@ class EditorInChiefAgent(BaseAgent):
                 source=self.agent_name,
                 target="cover_designer",
             ),
+            "sending_for_cover",
+            "Sending to cover designer",
+            story_id,
         )
 
     def _handle_cover_ready(self, message: AgentMessage) -> None:
         story_id = message.story_id
-        story = get_story(self.es, story_id)
+        story = self._stories.get(self.es, story_id)
         if not story:
             self.logger.error("story_not_found", story_id=story_id)
             return
@@ -464,7 +531,8 @@ class EditorInChiefAgent(BaseAgent):
 
     def _publish_story(self, story) -> None:
         story.status = StoryStatus.PUBLISHED
-        save_story(self.es, story)
+        self._stories.update(self.es, story, "status")
+        self.redis.delete(constants.PUBLISHED_STORIES_CACHE_KEY)
         self.log_activity(
             "story_published",
             f"'{story.title}' published after {story.revision_count} revision(s)",
@@ -473,6 +541,8 @@ class EditorInChiefAgent(BaseAgent):
 
         # Release the concurrency slot and start next queued story
         self._active_stories.discard(story.story_id)
+        self._stories.evict(story.story_id)
+        self._close_pending_feedback(story.story_id)
         if self._story_queue and len(self._active_stories) < self._max_concurrent:
             next_msg = self._story_queue.popleft()
             self.log_activity(
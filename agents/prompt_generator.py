@@ -8,7 +8,6 @@ from shared.config_loader import load_genres, load_prompt
 from shared.elasticsearch_client import save_story
 from shared.models import AgentMessage, Story, StoryStatus, WritingPrompt
 from shared.ollama_client import generate
-from shared.redis_client import enqueue_message
 
 from agents.base_agent import BaseAgent
 
@@ -92,10 +91,7 @@ class PromptGeneratorAgent(BaseAgent):
         self.record_metrics(story, "generate_prompt", elapsed, result.usage)
         save_story(self.es, story)
 
-        self.log_activity("prompt_generated", f"Prompt created for genre={genre['name']}", story_id)
-
-        enqueue_message(
-            self.redis,
+        self.log_and_enqueue(
             constants.QUEUE_ORCHESTRATOR,
             AgentMessage(
                 story_id=story_id,
@@ -104,6 +100,9 @@ class PromptGeneratorAgent(BaseAgent):
                 source=self.agent_name,
                 target="orchestrator",
             ),
+            "prompt_generated",
+            f"Prompt created for genre={genre['name']}",
+            story_id,
         )
 
 
@@ -4,10 +4,10 @@ import time
 
 from shared import constants
 from shared.config_loader import load_prompt
+from shared.diff_utils import word_diff
 from shared.elasticsearch_client import get_story, save_story
 from shared.models import AgentMessage, Revision, StoryStatus
 from shared.ollama_client import generate
-from shared.redis_client import enqueue_message
 
 from agents.base_agent import BaseAgent
 
@@ -51,10 +51,7 @@ class WriterAgent(BaseAgent):
         self.record_metrics(story, "write_draft", elapsed, result.usage)
         save_story(self.es, story)
 
-        self.log_activity("draft_written", f"Draft complete ({len(result.text.split())} words, {elapsed:.1f}s)", story_id)
-
-        enqueue_message(
-            self.redis,
+        self.log_and_enqueue(
             constants.QUEUE_ORCHESTRATOR,
             AgentMessage(
                 story_id=story_id,
@@ -62,6 +59,9 @@ class WriterAgent(BaseAgent):
                 source=self.agent_name,
                 target="orchestrator",
             ),
+            "draft_written",
+            f"Draft complete ({len(result.text.split())} words, {elapsed:.1f}s)",
+            story_id,
         )
 
     def _revise(self, message: AgentMessage) -> None:
@@ -88,11 +88,14 @@ class WriterAgent(BaseAgent):
         result = generate(user_prompt, self.system_prompt, model=story.model)
         elapsed = time.monotonic() - t0
 
+        # Render the dashboard's diff now, once, instead of on every page view
+        diff_html = word_diff(story.revisions[-1].content, result.text) if story.revisions else ""
         story.revisions.append(
             Revision(
                 round_number=round_number,
                 content=result.text,
                 feedback_addressed=feedback_summary,
+                diff_html=diff_html,
             )
         )
         story.current_draft = result.text
@@ -101,10 +104,7 @@ class WriterAgent(BaseAgent):
         self.record_metrics(story, "revise", elapsed, result.usage, round_number)
         save_story(self.es, story)
 
-        self.log_activity("revision_complete", f"Round {round_number} done ({len(result.text.split())} words, {elapsed:.1f}s)", story_id)
-
-        enqueue_message(
-            self.redis,
+        self.log_and_enqueue(
             constants.QUEUE_ORCHESTRATOR,
             AgentMessage(
                 story_id=story_id,
@@ -113,20 +113,18 @@ class WriterAgent(BaseAgent):
                 source=self.agent_name,
                 target="orchestrator",
             ),
+            "revision_complete",
+            f"Round {round_number} done ({len(result.text.split())} words, {elapsed:.1f}s)",
+            story_id,
         )
 
     def _extract_title(self, draft: str, story) -> str:
-        # Check the first few non-empty lines for a short title-like line
-        lines = draft.strip().split("\n")
-        for line in lines[:5]:
-            line = line.strip()
-            if not line:
-                continue
-            cleaned = line.lstrip("#").strip().strip('"').strip("*")
-            if 2 < len(cleaned) < 80:
-                return cleaned
-            # First non-empty line is too long — not a title
-            break
+        # Use the first non-empty line if it's short enough to be a title. Only
+        # that line is scanned, not the whole draft.
+        line = draft.lstrip().partition("\n")[0].strip()
+        cleaned = line.lstrip("#").strip().strip('"').strip("*")
+        if 2 < len(cleaned) < 80:
+            return cleaned
         return f"Untitled {story.prompt.genre.replace('_', ' ').title()} Story"
 
 
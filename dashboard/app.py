@@ -3,6 +3,7 @@ from pathlib import Path
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache
 
 from dashboard.routes import pipeline, stories, agents, events, export, anthologies
 
@@ -12,6 +13,10 @@ BASE_DIR = Path(__file__).parent
 app.mount("/static", StaticFiles(directory=BASE_DIR / "static"), name="static")
 
 templates = Jinja2Templates(directory=BASE_DIR / "templates")
+# Templates ship inside the image, so skip the per-render mtime check and keep
+# compiled bytecode on disk so worker restarts don't re-parse every template.
+templates.env.auto_reload = False
+templates.env.bytecode_cache = FileSystemBytecodeCache()
 
 # Share templates with route modules
 pipeline.templates = templates
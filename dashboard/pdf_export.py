@@ -2,16 +2,17 @@
 from __future__ import annotations
 
 import io
-import tempfile
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 
 from fpdf import FPDF
+from fpdf.svg import SVGObject
 
 try:
     import cairosvg
     _HAS_CAIROSVG = True
-except ImportError:
+except (ImportError, OSError):  # OSError: package present but libcairo missing
     _HAS_CAIROSVG = False
 
 
@@ -37,6 +38,35 @@ _FONTS = {
 FONT = "DejaVuSerif"
 
 
+_sanitize_cover = lru_cache(maxsize=256)(_sanitize_svg)
+
+
+@lru_cache(maxsize=256)
+def _rasterize_cover(cover_svg: str) -> bytes:
+    """Rasterize a sanitized SVG cover to PNG, memoized across PDF renders."""
+    return cairosvg.svg2png(bytestring=cover_svg.encode("utf-8"),
+                            output_width=600, output_height=900)
+
+
+def _fits_core_fonts(svg: str) -> bool:
+    """fpdf2 draws SVG text with the PDF core fonts, which only cover latin-1."""
+    try:
+        svg.encode("latin-1")
+        return True
+    except UnicodeEncodeError:
+        return False
+
+
+@lru_cache(maxsize=256)
+def _fpdf_can_draw(svg: str) -> bool:
+    """fpdf2's SVG support is partial (no rgba()/hsl() colors, no em units), so parse it up front."""
+    try:
+        SVGObject(svg)
+        return True
+    except Exception:
+        return False
+
+
 class BookPDF(FPDF):
     """Custom PDF with book-style headers and footers."""
 
@@ -46,9 +76,15 @@ class BookPDF(FPDF):
         self._chapter_title = ""
         self.set_auto_page_break(auto=True, margin=MARGIN_BOTTOM)
         self.set_top_margin(MARGIN_TOP)
-        # Register Unicode font
-        for style, path in _FONTS.items():
-            self.add_font(FONT, style=style, fname=str(path))
+
+    def set_font(self, family=None, style="", size=0):
+        # Parsing a TTF is the bulk of a document's setup cost, so register each
+        # style of the Unicode font the first time it's actually used.
+        if family == FONT:
+            style = style.upper()
+            if f"{FONT.lower()}{style}" not in self.fonts:
+                self.add_font(FONT, style=style, fname=str(_FONTS[style]))
+        super().set_font(family, style, size)
 
     def header(self):
         if self.page_no() <= 1:
@@ -112,22 +148,26 @@ class BookPDF(FPDF):
             self.multi_cell(0, 7, year, align="C")
 
     def _cover_page(self, cover_svg: str) -> bool:
-        """Render SVG cover as a full-page image. Returns True on success."""
-        if not _HAS_CAIROSVG or not cover_svg:
+        """Render SVG cover as a full-page image. Returns True on success.
+
+        Covers are embedded as vector graphics when fpdf2 can draw them; cairosvg
+        rasterization covers the rest. The page is only added once an image is ready.
+        """
+        if not cover_svg:
             return False
         try:
-            cover_svg = _sanitize_svg(cover_svg)
-            png_data = cairosvg.svg2png(bytestring=cover_svg.encode("utf-8"),
-                                        output_width=600, output_height=900)
-            with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp:
-                tmp.write(png_data)
-                tmp_path = tmp.name
-            self.add_page()
-            self.image(tmp_path, x=0, y=0, w=PAGE_W, h=PAGE_H)
-            Path(tmp_path).unlink(missing_ok=True)
-            return True
+            cover_svg = _sanitize_cover(cover_svg)
+            if _fits_core_fonts(cover_svg) and _fpdf_can_draw(cover_svg):
+                image = cover_svg.encode("utf-8")
+            elif _HAS_CAIROSVG:
+                image = _rasterize_cover(cover_svg)
+            else:
+                return False
         except Exception:
             return False
+        self.add_page()
+        self.image(io.BytesIO(image), x=0, y=0, w=PAGE_W, h=PAGE_H)
+        return True
 
     def _chapter_start(self, title: str, genre: str = ""):
         """Start a new chapter with a styled title."""
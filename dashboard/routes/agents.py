@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import asyncio
+
 from fastapi import APIRouter, Request
 from fastapi.templating import Jinja2Templates
 
@@ -13,7 +15,7 @@ templates: Jinja2Templates = None  # type: ignore  # set by app.py
 @router.get("/agents/activity")
 async def agent_log(request: Request):
     es = get_es_client()
-    logs = get_activity_logs(es, size=200)
+    logs = await asyncio.to_thread(get_activity_logs, es, size=200)
     return templates.TemplateResponse("agent_log.html", {
         "request": request,
         "logs": logs,
@@ -23,7 +25,7 @@ async def agent_log(request: Request):
 @router.get("/api/agents/health")
 async def agents_health():
     client = get_redis_client()
-    recent = get_recent_activity(client, count=20)
+    recent = await asyncio.to_thread(get_recent_activity, client, count=20)
     # Group by agent name, show latest activity
     agent_status = {}
     for log in recent:
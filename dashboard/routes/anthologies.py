@@ -1,30 +1,99 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+
+import structlog
 from fastapi import APIRouter, Form, Request
 from fastapi.responses import RedirectResponse, Response
 from fastapi.templating import Jinja2Templates
+from pydantic import TypeAdapter
 
+from shared.constants import PUBLISHED_STORIES_CACHE_KEY
 from shared.elasticsearch_client import (
     delete_anthology,
     get_anthology,
     get_es_client,
-    get_story,
+    get_stories_bulk,
     list_anthologies,
     list_stories,
     save_anthology,
 )
-from shared.models import Anthology
+from shared.models import Anthology, Story
 from shared.ollama_client import generate
+from shared.redis_client import get_redis_client
 from dashboard.pdf_export import generate_anthology_pdf
 
+logger = structlog.get_logger()
 router = APIRouter()
 templates: Jinja2Templates = None  # type: ignore  # set by app.py
 
+_PDF_CACHE_TTL = 7 * 24 * 3600  # seconds
+_PUBLISHED_CACHE_TTL = 60  # seconds; the orchestrator also clears it on publish
+_STORY_LIST = TypeAdapter(list[Story])
+# Only what the "Add Stories" table shows; skips revisions, feedback and covers
+_PICKER_FIELDS = ["story_id", "title", "status", "prompt", "current_draft", "updated_at"]
+
+
+def _list_published_stories(es) -> list[Story]:
+    """Published stories for the "Add Stories" picker, cached briefly in Redis."""
+    client = get_redis_client()
+    try:
+        cached = client.get(PUBLISHED_STORIES_CACHE_KEY)
+    except Exception:
+        logger.warning("published_cache_get_failed")
+        cached = None
+    if cached is not None:
+        return _STORY_LIST.validate_json(cached)
+
+    stories = list_stories(es, status="PUBLISHED", size=200, fields=_PICKER_FIELDS)
+    if stories:  # list_stories returns [] on ES errors; don't pin that
+        try:
+            client.setex(PUBLISHED_STORIES_CACHE_KEY, _PUBLISHED_CACHE_TTL, _STORY_LIST.dump_json(stories))
+        except Exception:
+            logger.warning("published_cache_put_failed")
+    return stories
+
+
+def _anthology_pdf_cache_key(anthology: Anthology, stories: list[Story]) -> str:
+    """Key that changes whenever the title, description, story order or any story changes."""
+    h = hashlib.sha256()
+    for part in (anthology.title, anthology.description):
+        h.update(part.encode("utf-8") + b"\0")
+    for story in stories:
+        h.update(f"{story.story_id}:{story.updated_at.isoformat()}\0".encode("utf-8"))
+    return f"pdf:anth:{anthology.anthology_id}:{h.hexdigest()}"
+
+
+async def _render_anthology_pdf(anthology: Anthology, stories: list[Story]) -> bytes:
+    client = get_redis_client(binary=True)
+    key = _anthology_pdf_cache_key(anthology, stories)
+    try:
+        cached = await asyncio.to_thread(client.getex, key, ex=_PDF_CACHE_TTL)
+    except Exception:
+        logger.warning("pdf_cache_get_failed", anthology_id=anthology.anthology_id)
+        cached = None
+    if cached is not None:
+        return cached
+
+    # fpdf2 rendering is CPU-bound; keep it off the event loop
+    pdf_bytes = await asyncio.to_thread(
+        generate_anthology_pdf,
+        stories,
+        title=anthology.title,
+        description=anthology.description,
+    )
+    try:
+        await asyncio.to_thread(client.setex, key, _PDF_CACHE_TTL, pdf_bytes)
+    except Exception:
+        logger.warning("pdf_cache_put_failed", anthology_id=anthology.anthology_id)
+    return pdf_bytes
+
 
 @router.get("/anthologies")
 async def anthologies_list(request: Request):
     es = get_es_client()
-    anthologies = list_anthologies(es)
+    anthologies = await asyncio.to_thread(list_anthologies, es)
     return templates.TemplateResponse("anthologies_list.html", {
         "request": request,
         "anthologies": anthologies,
@@ -34,19 +103,15 @@ async def anthologies_list(request: Request):
 @router.get("/anthologies/{anthology_id}")
 async def anthology_detail(request: Request, anthology_id: str):
     es = get_es_client()
-    anthology = get_anthology(es, anthology_id)
+    anthology = await asyncio.to_thread(get_anthology, es, anthology_id)
     if not anthology:
         return Response("Anthology not found", status_code=404)
 
-    # Fetch included stories
-    included_stories = []
-    for sid in anthology.story_ids:
-        story = get_story(es, sid)
-        if story:
-            included_stories.append(story)
-
-    # Fetch published stories not already included for the "Add Stories" section
-    all_published = list_stories(es, status="PUBLISHED", size=200)
+    # Fetch included stories, and published ones for the "Add Stories" section
+    included_stories, all_published = await asyncio.gather(
+        asyncio.to_thread(get_stories_bulk, es, anthology.story_ids),
+        asyncio.to_thread(_list_published_stories, es),
+    )
     included_set = set(anthology.story_ids)
     available_stories = [s for s in all_published if s.story_id not in included_set]
 
@@ -62,71 +127,66 @@ async def anthology_detail(request: Request, anthology_id: str):
 async def create_anthology(title: str = Form(...)):
     es = get_es_client()
     anthology = Anthology(title=title.strip())
-    save_anthology(es, anthology)
+    await asyncio.to_thread(save_anthology, es, anthology)
     return RedirectResponse(f"/anthologies/{anthology.anthology_id}", status_code=303)
 
 
 @router.post("/api/anthologies/{anthology_id}/stories")
 async def add_stories(anthology_id: str, request: Request):
     es = get_es_client()
-    anthology = get_anthology(es, anthology_id)
+    anthology = await asyncio.to_thread(get_anthology, es, anthology_id)
     if not anthology:
         return Response("Anthology not found", status_code=404)
 
     form = await request.form()
     story_ids = form.getlist("story_ids")
-    existing = set(anthology.story_ids)
-    for sid in story_ids:
-        if sid not in existing:
-            anthology.story_ids.append(sid)
-            existing.add(sid)
-    save_anthology(es, anthology)
+    # Dedupe while keeping existing order, new stories appended in form order
+    anthology.story_ids = list(dict.fromkeys([*anthology.story_ids, *story_ids]))
+    await asyncio.to_thread(save_anthology, es, anthology)
     return RedirectResponse(f"/anthologies/{anthology_id}", status_code=303)
 
 
 @router.post("/api/anthologies/{anthology_id}/stories/{story_id}/remove")
 async def remove_story(anthology_id: str, story_id: str):
     es = get_es_client()
-    anthology = get_anthology(es, anthology_id)
+    anthology = await asyncio.to_thread(get_anthology, es, anthology_id)
     if not anthology:
         return Response("Anthology not found", status_code=404)
 
     anthology.story_ids = [sid for sid in anthology.story_ids if sid != story_id]
-    save_anthology(es, anthology)
+    await asyncio.to_thread(save_anthology, es, anthology)
     return RedirectResponse(f"/anthologies/{anthology_id}", status_code=303)
 
 
 @router.post("/api/anthologies/{anthology_id}/title")
 async def update_title(anthology_id: str, title: str = Form(...)):
     es = get_es_client()
-    anthology = get_anthology(es, anthology_id)
+    anthology = await asyncio.to_thread(get_anthology, es, anthology_id)
     if not anthology:
         return Response("Anthology not found", status_code=404)
 
     anthology.title = title.strip()
-    save_anthology(es, anthology)
+    await asyncio.to_thread(save_anthology, es, anthology)
     return RedirectResponse(f"/anthologies/{anthology_id}", status_code=303)
 
 
 @router.post("/api/anthologies/{anthology_id}/generate-description")
 async def generate_description(anthology_id: str):
     es = get_es_client()
-    anthology = get_anthology(es, anthology_id)
+    anthology = await asyncio.to_thread(get_anthology, es, anthology_id)
     if not anthology:
         return Response("Anthology not found", status_code=404)
 
     # Build context from included stories
     story_summaries = []
-    for sid in anthology.story_ids:
-        story = get_story(es, sid)
-        if story:
-            genre = story.prompt.genre.replace("_", " ").title() if story.prompt and story.prompt.genre else "Unknown"
-            excerpt = (story.current_draft or "")[:300]
-            story_summaries.append(f"- \"{story.title}\" (Genre: {genre})\n  Excerpt: {excerpt}...")
+    for story in await asyncio.to_thread(get_stories_bulk, es, anthology.story_ids):
+        genre = story.prompt.genre.replace("_", " ").title() if story.prompt and story.prompt.genre else "Unknown"
+        excerpt = (story.current_draft or "")[:300]
+        story_summaries.append(f"- \"{story.title}\" (Genre: {genre})\n  Excerpt: {excerpt}...")
 
     if not story_summaries:
         anthology.description = "An anthology of collected stories."
-        save_anthology(es, anthology)
+        await asyncio.to_thread(save_anthology, es, anthology)
         return RedirectResponse(f"/anthologies/{anthology_id}", status_code=303)
 
     stories_context = "\n".join(story_summaries)
@@ -138,52 +198,44 @@ async def generate_description(anthology_id: str):
     )
     system_prompt = "You are a literary editor writing anthology descriptions for book covers."
 
-    result = generate(prompt, system_prompt=system_prompt)
+    result = await asyncio.to_thread(generate, prompt, system_prompt=system_prompt)
     anthology.description = result.text.strip()
-    save_anthology(es, anthology)
+    await asyncio.to_thread(save_anthology, es, anthology)
     return RedirectResponse(f"/anthologies/{anthology_id}", status_code=303)
 
 
 @router.post("/api/anthologies/{anthology_id}/description")
 async def save_description(anthology_id: str, description: str = Form(...)):
     es = get_es_client()
-    anthology = get_anthology(es, anthology_id)
+    anthology = await asyncio.to_thread(get_anthology, es, anthology_id)
     if not anthology:
         return Response("Anthology not found", status_code=404)
 
     anthology.description = description.strip()
-    save_anthology(es, anthology)
+    await asyncio.to_thread(save_anthology, es, anthology)
     return RedirectResponse(f"/anthologies/{anthology_id}", status_code=303)
 
 
 @router.post("/api/anthologies/{anthology_id}/delete")
 async def delete_anthology_route(anthology_id: str):
     es = get_es_client()
-    delete_anthology(es, anthology_id)
+    await asyncio.to_thread(delete_anthology, es, anthology_id)
     return RedirectResponse("/anthologies", status_code=303)
 
 
 @router.get("/anthologies/{anthology_id}/pdf")
 async def download_anthology_pdf(anthology_id: str):
     es = get_es_client()
-    anthology = get_anthology(es, anthology_id)
+    anthology = await asyncio.to_thread(get_anthology, es, anthology_id)
     if not anthology:
         return Response("Anthology not found", status_code=404)
 
-    stories = []
-    for sid in anthology.story_ids:
-        story = get_story(es, sid)
-        if story and story.current_draft:
-            stories.append(story)
+    stories = [s for s in await asyncio.to_thread(get_stories_bulk, es, anthology.story_ids) if s.current_draft]
 
     if not stories:
         return Response("No stories with content found in this anthology", status_code=404)
 
-    pdf_bytes = generate_anthology_pdf(
-        stories,
-        title=anthology.title,
-        description=anthology.description,
-    )
+    pdf_bytes = await _render_anthology_pdf(anthology, stories)
     slug = (anthology.title or "anthology").replace(" ", "_").lower()[:40]
     return Response(
         content=pdf_bytes,
@@ -1,79 +1,54 @@
 from __future__ import annotations
 
-import asyncio
-import json
+import orjson
+from fastapi import APIRouter
+from sse_starlette.sse import EventSourceResponse, ServerSentEvent
 
-from fastapi import APIRouter, Request
-from fastapi.responses import StreamingResponse
-
-from shared.config_loader import load_pipeline_config
 from shared.constants import ACTIVITY_CHANNEL
+from shared.redis_client import get_async_redis_client
 
 router = APIRouter()
 
+_HEARTBEAT_INTERVAL = 15  # seconds between keepalive pings
 
-async def _event_generator(request: Request):
-    import redis
 
-    config = load_pipeline_config()["redis"]
-    client = redis.Redis(
-        host=config["host"],
-        port=config["port"],
-        db=config["db"],
-        decode_responses=True,
-    )
-    pubsub = client.pubsub()
-    pubsub.subscribe(ACTIVITY_CHANNEL)
+async def _event_generator():
+    # Raw bytes: messages go out as-is, without a decode/encode round-trip
+    pubsub = get_async_redis_client(binary=True).pubsub()
 
     try:
-        # Send retry hint for browser reconnection
-        yield "retry: 3000\n\n"
+        await pubsub.subscribe(ACTIVITY_CHANNEL)
 
-        heartbeat_interval = 15
-        elapsed = 0.0
-        poll_interval = 1.0
+        # Send retry hint for browser reconnection
+        yield ServerSentEvent(retry=3000)
 
+        # EventSourceResponse sends the pings and cancels us on disconnect,
+        # so block on Redis instead of polling.
         while True:
-            if await request.is_disconnected():
-                break
-
-            msg = await asyncio.to_thread(
-                pubsub.get_message, ignore_subscribe_messages=True, timeout=poll_interval
-            )
-
-            if msg and msg["type"] == "message":
-                data = msg["data"]
-                # Validate it's JSON before sending
-                try:
-                    json.loads(data)
-                except (json.JSONDecodeError, TypeError):
-                    data = json.dumps({"raw": str(data)})
-                yield f"data: {data}\n\n"
-                elapsed = 0.0
-            else:
-                elapsed += poll_interval
-                if elapsed >= heartbeat_interval:
-                    yield ": heartbeat\n\n"
-                    elapsed = 0.0
+            msg = await pubsub.get_message(ignore_subscribe_messages=True, timeout=None)
+            if not msg or msg["type"] != "message":
+                continue
+            data = msg["data"]
+            # Validate it's JSON before sending, and keep it on one line so it
+            # fits in a single data: field
+            try:
+                parsed = orjson.loads(data)
+                if b"\n" in data:
+                    data = orjson.dumps(parsed)
+            except orjson.JSONDecodeError:
+                data = orjson.dumps({"raw": data.decode("utf-8", "replace")})
+            yield b"data: " + data + b"\n\n"
     except Exception:
         # Redis error — client will reconnect via retry header
         pass
     finally:
         try:
-            pubsub.unsubscribe()
-            pubsub.close()
-            client.close()
+            await pubsub.unsubscribe()
+            await pubsub.aclose()
         except Exception:
             pass
 
 
 @router.get("/api/events/stream")
-async def event_stream(request: Request):
-    return StreamingResponse(
-        _event_generator(request),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "X-Accel-Buffering": "no",
-        },
-    )
+async def event_stream():
+    return EventSourceResponse(_event_generator(), ping=_HEARTBEAT_INTERVAL)
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import asyncio
+import time
 import uuid
 
 import httpx
@@ -12,25 +14,56 @@ from shared.config_loader import load_genres, load_pipeline_config
 from shared.constants import QUEUE_ORCHESTRATOR
 from shared.elasticsearch_client import get_es_client, get_pipeline_counts, list_stories
 from shared.models import AgentMessage
-from shared.redis_client import enqueue_message, get_redis_client
+from shared.redis_client import enqueue_message_async, get_async_redis_client
 
 logger = structlog.get_logger()
 router = APIRouter()
 templates: Jinja2Templates = None  # type: ignore  # set by app.py
 
+# Columns of the homepage story table
+_LIST_FIELDS = [
+    "story_id", "title", "prompt", "model", "status", "revision_count",
+    "total_duration_seconds", "total_tokens", "updated_at",
+]
+
+_ollama_http = httpx.AsyncClient(timeout=5)  # keep-alive connection reused across page loads
+
+_MODELS_TTL = 30  # seconds; installed models rarely change
+_models_cache: tuple[float, list[dict]] = (0.0, [])  # (fetched_at, models)
+
+_COUNTS_TTL = 5  # seconds the homepage status counts may lag behind the agents
+_counts_cache: tuple[float, dict[str, int]] = (0.0, {})  # (fetched_at, counts)
+
+
+def _pipeline_counts(es) -> dict[str, int]:
+    """Story counts by status, cached for _COUNTS_TTL."""
+    global _counts_cache
+    fetched_at, cached = _counts_cache
+    if cached and time.monotonic() - fetched_at < _COUNTS_TTL:
+        return cached
+    counts = get_pipeline_counts(es)
+    if counts:  # {} means ES failed or there are no stories yet; retry next time
+        _counts_cache = (time.monotonic(), counts)
+    return counts
+
+
+async def _fetch_ollama_models() -> list[dict]:
+    """Fetch installed models from Ollama's /api/tags endpoint, cached for _MODELS_TTL."""
+    global _models_cache
+    fetched_at, cached = _models_cache
+    if cached and time.monotonic() - fetched_at < _MODELS_TTL:
+        return cached
 
-def _fetch_ollama_models() -> list[dict]:
-    """Fetch installed models from Ollama's /api/tags endpoint."""
     config = load_pipeline_config()["ollama"]
     try:
-        with httpx.Client(timeout=5) as client:
-            resp = client.get(f"{config['base_url']}/api/tags")
-            resp.raise_for_status()
-            models = resp.json().get("models", [])
-            return [
-                {"name": m["name"], "size_gb": round(m.get("size", 0) / 1e9, 1)}
-                for m in models
-            ]
+        resp = await _ollama_http.get(f"{config['base_url']}/api/tags")
+        resp.raise_for_status()
+        models = [
+            {"name": m["name"], "size_gb": round(m.get("size", 0) / 1e9, 1)}
+            for m in resp.json().get("models", [])
+        ]
+        _models_cache = (time.monotonic(), models)
+        return models
     except Exception:
         logger.warning("ollama_models_fetch_failed")
         return []
@@ -39,10 +72,13 @@ def _fetch_ollama_models() -> list[dict]:
 @router.get("/")
 async def index(request: Request):
     es = get_es_client()
-    counts = get_pipeline_counts(es)
-    active_stories = list_stories(es, size=20)
+    # ES client calls are blocking; run them in threads alongside the Ollama fetch
+    counts, active_stories, models = await asyncio.gather(
+        asyncio.to_thread(_pipeline_counts, es),
+        asyncio.to_thread(list_stories, es, size=20, fields=_LIST_FIELDS),
+        _fetch_ollama_models(),
+    )
     config = load_pipeline_config()["ollama"]
-    models = _fetch_ollama_models()
     genres = sorted(load_genres().get("genres", []), key=lambda g: g["name"])
     return templates.TemplateResponse("index.html", {
         "request": request,
@@ -56,7 +92,6 @@ async def index(request: Request):
 
 @router.post("/api/pipeline/trigger")
 async def trigger_story(user_prompt: str = Form(""), model: str = Form(""), genre: str = Form("")):
-    client = get_redis_client()
     story_id = uuid.uuid4().hex[:12]
     payload = {}
     if user_prompt.strip():
@@ -72,5 +107,11 @@ async def trigger_story(user_prompt: str = Form(""), model: str = Form(""), genr
         source="dashboard",
         target="orchestrator",
     )
-    enqueue_message(client, QUEUE_ORCHESTRATOR, msg)
+    # Await the XADD on the async client so a Redis failure reaches the user as an
+    # error instead of a redirect for a story that was never queued.
+    try:
+        await enqueue_message_async(get_async_redis_client(), QUEUE_ORCHESTRATOR, msg)
+    except Exception:
+        logger.exception("trigger_enqueue_failed", story_id=story_id)
+        raise
     return RedirectResponse(url="/", status_code=303)
@@ -1,34 +1,35 @@
 from __future__ import annotations
 
-import difflib
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import cache
+
 from markupsafe import Markup
 
 from fastapi import APIRouter, Request
 from fastapi.templating import Jinja2Templates
 
+from shared.diff_utils import word_diff
 from shared.elasticsearch_client import get_es_client, get_story, list_stories
 
 router = APIRouter()
 templates: Jinja2Templates = None  # type: ignore  # set by app.py
 
+# Columns of the stories table; the draft is only checked for export eligibility
+_LIST_FIELDS = ["story_id", "title", "prompt", "model", "status", "revision_count", "current_draft", "created_at"]
+
+# Below this much revision text, diffing inline is cheaper than shipping it to a worker
+_INLINE_DIFF_CHARS = 2048
+_DIFF_WORKERS = min(4, os.cpu_count() or 1)
+
 
-def _word_diff(old: str, new: str) -> str:
-    """Return HTML with <ins>/<del> tags showing word-level changes."""
-    old_words = old.split()
-    new_words = new.split()
-    sm = difflib.SequenceMatcher(None, old_words, new_words)
-    parts: list[str] = []
-    for op, i1, i2, j1, j2 in sm.get_opcodes():
-        if op == "equal":
-            parts.append(" ".join(old_words[i1:i2]))
-        elif op == "delete":
-            parts.append(f'<del>{"  ".join(old_words[i1:i2])}</del>')
-        elif op == "insert":
-            parts.append(f'<ins>{" ".join(new_words[j1:j2])}</ins>')
-        elif op == "replace":
-            parts.append(f'<del>{" ".join(old_words[i1:i2])}</del>')
-            parts.append(f'<ins>{" ".join(new_words[j1:j2])}</ins>')
-    return " ".join(parts)
+@cache
+def _diff_pool() -> ProcessPoolExecutor:
+    # forkserver, not the Linux default fork: forking uvicorn while to_thread workers
+    # hold locks can deadlock the child
+    return ProcessPoolExecutor(max_workers=_DIFF_WORKERS, mp_context=multiprocessing.get_context("forkserver"))
 
 
 def _build_revision_diffs(story) -> list[dict]:
@@ -44,7 +45,8 @@ def _build_revision_diffs(story) -> list[dict]:
             label = "Initial draft → Revision 1"
         else:
             prev = story.revisions[i - 1]
-            diff_html = _word_diff(prev.content, rev.content)
+            # The writer stores the diff with each revision; older ones lack it
+            diff_html = rev.diff_html or word_diff(prev.content, rev.content)
             label = f"Revision {prev.round_number} → Revision {rev.round_number}"
 
         diffs.append({
@@ -61,7 +63,7 @@ def _build_revision_diffs(story) -> list[dict]:
 @router.get("/stories")
 async def stories_list(request: Request, status: str | None = None):
     es = get_es_client()
-    all_stories = list_stories(es, status=status, size=100)
+    all_stories = await asyncio.to_thread(list_stories, es, status=status, size=100, fields=_LIST_FIELDS)
     return templates.TemplateResponse("stories_list.html", {
         "request": request,
         "stories": all_stories,
@@ -72,8 +74,14 @@ async def stories_list(request: Request, status: str | None = None):
 @router.get("/stories/{story_id}")
 async def story_detail(request: Request, story_id: str):
     es = get_es_client()
-    story = get_story(es, story_id)
-    diffs = _build_revision_diffs(story)
+    story = await asyncio.to_thread(get_story, es, story_id)
+    pending = sum(len(rev.content) for rev in story.revisions[1:] if not rev.diff_html) if story else 0
+    if pending > _INLINE_DIFF_CHARS:
+        # Diffing is CPU-bound; keep it off the event loop and the GIL
+        loop = asyncio.get_running_loop()
+        diffs = await loop.run_in_executor(_diff_pool(), _build_revision_diffs, story)
+    else:
+        diffs = _build_revision_diffs(story)
     return templates.TemplateResponse("story_detail.html", {
         "request": request,
         "story": story,
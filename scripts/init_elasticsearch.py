@@ -26,13 +26,17 @@ STORIES_MAPPING = {
                     "additional_instructions": {"type": "text"},
                 },
             },
-            "current_draft": {"type": "text"},
+            # Story bodies are only ever rendered, never searched; skip building an inverted index.
+            # Dashboard lists and counts read the top-level counters (revision_count,
+            # total_*), never the nested revisions/feedback/metrics.
+            "current_draft": {"type": "text", "index": False},
             "revisions": {
                 "type": "nested",
                 "properties": {
                     "round_number": {"type": "integer"},
-                    "content": {"type": "text"},
+                    "content": {"type": "text", "index": False},
                     "feedback_addressed": {"type": "text"},
+                    "diff_html": {"type": "text", "index": False},
                     "timestamp": {"type": "date"},
                 },
             },
@@ -74,13 +78,21 @@ STORIES_MAPPING = {
 }
 
 ACTIVITY_LOGS_MAPPING = {
-    "settings": {"number_of_shards": 1, "number_of_replicas": 0},
+    "settings": {
+        "number_of_shards": 1,
+        "number_of_replicas": 0,
+        # Append-only log written in bulk: trade durability/visibility for indexing throughput
+        "refresh_interval": "30s",
+        "translog": {"durability": "async", "flush_threshold_size": "1gb"},
+    },
     "mappings": {
         "properties": {
             "agent_name": {"type": "keyword"},
             "story_id": {"type": "keyword"},
             "action": {"type": "keyword"},
             "detail": {"type": "text"},
+            "round_number": {"type": "integer"},
+            "approved": {"type": "boolean"},
             "timestamp": {"type": "date"},
         }
     },
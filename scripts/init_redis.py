@@ -0,0 +1,17 @@
+"""Prepare the Redis queue streams on startup, before any agent or producer runs."""
+from shared.constants import QUEUE_GROUPS
+from shared.redis_client import ensure_consumer_group, get_redis_client, migrate_legacy_queue
+
+
+def main():
+    client = get_redis_client()
+    for queue, group in QUEUE_GROUPS.items():
+        moved = migrate_legacy_queue(client, queue)
+        if moved:
+            print(f"Queue '{queue}' converted from a list to a stream ({moved} messages).")
+        ensure_consumer_group(client, queue, group)
+    print("Redis initialization complete.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,10 @@
-"""Manually trigger a new story by sending start_new_story to the orchestrator.
+"""Manually trigger new stories by sending start_new_story to the orchestrator.
 
 Usage:
     python -m scripts.seed_prompt
     python -m scripts.seed_prompt "A detective who can taste lies"
     python -m scripts.seed_prompt --genre horror "a dark forest"
+    python -m scripts.seed_prompt --count 10
 """
 import argparse
 import uuid
@@ -11,41 +12,58 @@ import uuid
 from shared.config_loader import load_pipeline_config
 from shared.constants import QUEUE_ORCHESTRATOR
 from shared.models import AgentMessage
-from shared.redis_client import enqueue_message, get_redis_client
+from shared.redis_client import enqueue_messages, get_redis_client
+
+
+def seed_stories(prompts: list[str], genre: str = "") -> list[str]:
+    """Enqueue one start_new_story per prompt in a single Redis round-trip.
+
+    An empty prompt lets the prompt generator pick one. Returns the new story ids.
+    """
+    model = load_pipeline_config()["ollama"]["model"]
+    messages = []
+    for user_prompt in prompts:
+        payload = {"model": model}
+        if user_prompt:
+            payload["user_prompt"] = user_prompt
+        if genre:
+            payload["genre"] = genre
+        messages.append(AgentMessage(
+            story_id=uuid.uuid4().hex[:12],
+            action="start_new_story",
+            payload=payload,
+            source="seed_script",
+            target="orchestrator",
+        ))
+    enqueue_messages(get_redis_client(), QUEUE_ORCHESTRATOR, messages)
+    return [msg.story_id for msg in messages]
+
+
+def _positive_int(value: str) -> int:
+    count = int(value)
+    if count < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {count}")
+    return count
 
 
 def main():
-    parser = argparse.ArgumentParser(description="Trigger a new story")
+    parser = argparse.ArgumentParser(description="Trigger new stories")
     parser.add_argument("user_prompt", nargs="?", default="", help="Optional story idea")
     parser.add_argument("--genre", default="", help="Optional genre (e.g. horror, fantasy)")
+    parser.add_argument("--count", type=_positive_int, default=1, help="Number of stories to seed")
     args = parser.parse_args()
 
-    client = get_redis_client()
-    config = load_pipeline_config()
-    story_id = uuid.uuid4().hex[:12]
     user_prompt = args.user_prompt.strip()
     genre = args.genre.strip()
-    payload = {"model": config["ollama"]["model"]}
-    if user_prompt:
-        payload["user_prompt"] = user_prompt
-    if genre:
-        payload["genre"] = genre
-    msg = AgentMessage(
-        story_id=story_id,
-        action="start_new_story",
-        payload=payload,
-        source="seed_script",
-        target="orchestrator",
-    )
-    enqueue_message(client, QUEUE_ORCHESTRATOR, msg)
-    parts = [f"Seeded story {story_id}"]
-    if genre:
-        parts.append(f"genre={genre}")
-    if user_prompt:
-        parts.append(f"prompt: {user_prompt}")
-    else:
-        parts.append("(random prompt)")
-    print(" | ".join(parts))
+    for story_id in seed_stories([user_prompt] * args.count, genre=genre):
+        parts = [f"Seeded story {story_id}"]
+        if genre:
+            parts.append(f"genre={genre}")
+        if user_prompt:
+            parts.append(f"prompt: {user_prompt}")
+        else:
+            parts.append("(random prompt)")
+        print(" | ".join(parts))
 
 
 if __name__ == "__main__":
@@ -1,25 +1,34 @@
 import os
+from functools import cache
 from pathlib import Path
 
 import yaml
 
 CONFIG_DIR = Path(os.environ.get("CONFIG_DIR", "/app/config"))
 
+# libyaml's C loader when PyYAML was built with it
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 def load_yaml(filename: str) -> dict:
     path = CONFIG_DIR / filename
     with open(path) as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=_Loader)
 
 
+# Config files are baked into the image, so parse each once per process.
+# The returned dicts are shared: treat them as read-only.
+@cache
 def load_genres() -> dict:
     return load_yaml("genres.yml")
 
 
+@cache
 def load_pipeline_config() -> dict:
     return load_yaml("pipeline.yml")
 
 
+@cache
 def load_prompt(agent_name: str) -> str:
     path = CONFIG_DIR / "prompts" / f"{agent_name}.txt"
     return path.read_text().strip()
@@ -5,11 +5,26 @@ QUEUE_WRITER = "queue:writer"
 QUEUE_REVIEWER = "queue:reviewer"
 QUEUE_EDITOR = "queue:editor"
 QUEUE_COVER_DESIGNER = "queue:cover_designer"
+QUEUE_DEAD_LETTER = "queue:dead_letter"  # messages that failed max_deliveries times
+DEAD_LETTER_MAXLEN = 10_000  # approximate cap on the dead-letter stream; work queues are never capped
+
+# Consumer group (the agent name) that reads each queue stream
+QUEUE_GROUPS = {
+    QUEUE_ORCHESTRATOR: "orchestrator",
+    QUEUE_PROMPT_GENERATOR: "prompt_generator",
+    QUEUE_WRITER: "writer",
+    QUEUE_REVIEWER: "reviewer",
+    QUEUE_EDITOR: "editor",
+    QUEUE_COVER_DESIGNER: "cover_designer",
+}
 
 # Redis activity
 ACTIVITY_LOG_KEY = "activity:log"
 ACTIVITY_CHANNEL = "agent:activity"
 
+# Redis caches
+PUBLISHED_STORIES_CACHE_KEY = "cache:stories:published"
+
 # Elasticsearch index names
 STORIES_INDEX = "stories"
 ACTIVITY_LOGS_INDEX = "activity_logs"
@@ -0,0 +1,39 @@
+"""Word-level diff rendering for story revisions."""
+from __future__ import annotations
+
+from rapidfuzz.distance import Levenshtein
+
+
+def word_diff(old: str, new: str) -> str:
+    """Return HTML with <ins>/<del> tags showing word-level changes."""
+    old_words = old.split()
+    new_words = new.split()
+    parts: list[str] = []
+    # rapidfuzz computes the word-level edit script in native code
+    for equal, i1, i2, j1, j2 in _merged_opcodes(old_words, new_words):
+        if equal:
+            # Unchanged runs go straight into the single final join
+            parts.extend(old_words[i1:i2])
+            continue
+        if i1 < i2:
+            parts.append(f'<del>{" ".join(old_words[i1:i2])}</del>')
+        if j1 < j2:
+            parts.append(f'<ins>{" ".join(new_words[j1:j2])}</ins>')
+    return " ".join(parts)
+
+
+def _merged_opcodes(old_words: list[str], new_words: list[str]) -> list[tuple[bool, int, int, int, int]]:
+    """Levenshtein opcodes with each run of adjacent insert/delete/replace merged into one change.
+
+    Levenshtein can split a substitution into e.g. insert + replace; merging keeps
+    one <del>/<ins> pair per changed span, as difflib's opcodes did.
+    """
+    merged: list[tuple[bool, int, int, int, int]] = []
+    for op, i1, i2, j1, j2 in Levenshtein.opcodes(old_words, new_words):
+        equal = op == "equal"
+        if merged and not equal and not merged[-1][0]:
+            _, start_i, _, start_j, _ = merged[-1]
+            merged[-1] = (False, start_i, i2, start_j, j2)
+        else:
+            merged.append((equal, i1, i2, j1, j2))
+    return merged
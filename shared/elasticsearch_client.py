@@ -1,8 +1,14 @@
 from __future__ import annotations
 
+import queue
+import threading
+import time
 from datetime import datetime, timezone
+from functools import cache
 
 from elasticsearch import Elasticsearch
+from elasticsearch.helpers import bulk
+from elasticsearch.serializer import OrjsonSerializer
 import structlog
 
 from shared.config_loader import load_pipeline_config
@@ -12,17 +18,70 @@ from shared.models import ActivityLog, Anthology, Story
 logger = structlog.get_logger()
 
 
+@cache
 def get_es_client() -> Elasticsearch:
+    """Return the process-wide Elasticsearch client (thread-safe, pooled per node)."""
     config = load_pipeline_config()["elasticsearch"]
-    return Elasticsearch(config["hosts"])
+    return Elasticsearch(
+        config["hosts"],
+        http_compress=True,
+        connections_per_node=config.get("connections_per_node", 8),
+        request_timeout=config.get("request_timeout", 30),
+        serializer=OrjsonSerializer(),
+    )
+
+
+# Trim search responses to the documents themselves (no took/_shards/_score)
+_HITS_SOURCE = "hits.hits._source"
+
+
+def _hit_sources(result) -> list[dict]:
+    """Return each hit's _source; filter_path drops "hits" entirely when nothing matched."""
+    return [hit["_source"] for hit in result.body.get("hits", {}).get("hits", [])]
 
 
 # --- Story CRUD ---
 
-def save_story(es: Elasticsearch, story: Story) -> None:
+def _version_kwargs(version: tuple[int, int] | None) -> dict[str, int]:
+    """Optimistic-concurrency arguments: the write fails with ConflictError if the doc moved on."""
+    if version is None:
+        return {}
+    return {"if_seq_no": version[0], "if_primary_term": version[1]}
+
+
+def save_story(es: Elasticsearch, story: Story, version: tuple[int, int] | None = None) -> tuple[int, int]:
+    """Index the story and return its new (seq_no, primary_term) version token.
+
+    Pass the version the story was read at to reject the write if it changed since.
+    """
     story.updated_at = datetime.now(timezone.utc)
-    es.index(index=STORIES_INDEX, id=story.story_id, document=story.model_dump(mode="json"))
+    result = es.index(
+        index=STORIES_INDEX,
+        id=story.story_id,
+        document=story.model_dump(mode="json"),
+        **_version_kwargs(version),
+    )
     logger.info("story_saved", story_id=story.story_id, status=story.status)
+    return result["_seq_no"], result["_primary_term"]
+
+
+def update_story_fields(
+    es: Elasticsearch,
+    story: Story,
+    *fields: str,
+    version: tuple[int, int] | None = None,
+) -> tuple[int, int]:
+    """Partially update only the given fields of an already-indexed story.
+
+    Avoids serializing and shipping the draft, revisions and cover for
+    status-only transitions. Pass the version the story was read at to reject
+    the write if it changed since. Returns the new (seq_no, primary_term).
+    """
+    story.updated_at = datetime.now(timezone.utc)
+    doc = story.model_dump(mode="json", include={*fields, "updated_at"})
+    result = es.update(index=STORIES_INDEX, id=story.story_id, doc=doc, **_version_kwargs(version))
+    logger.info("story_updated", story_id=story.story_id, status=story.status, fields=list(fields))
+    return result["_seq_no"], result["_primary_term"]
 
 
 def get_story(es: Elasticsearch, story_id: str) -> Story | None:
@@ -33,7 +92,34 @@ def get_story(es: Elasticsearch, story_id: str) -> Story | None:
         return None
 
 
-def list_stories(es: Elasticsearch, status: str | None = None, size: int = 50) -> list[Story]:
+def get_stories_bulk(es: Elasticsearch, story_ids: list[str]) -> list[Story]:
+    """Fetch many stories in one mget round-trip, in the given order, skipping missing ones."""
+    if not story_ids:
+        return []
+    try:
+        result = es.mget(index=STORIES_INDEX, ids=story_ids, filter_path="docs.found,docs._source")
+        return [Story.model_validate(doc["_source"]) for doc in result["docs"] if doc.get("found")]
+    except Exception:
+        logger.error("get_stories_bulk_failed", count=len(story_ids))
+        return []
+
+
+def get_story_with_version(es: Elasticsearch, story_id: str) -> tuple[Story, int, int] | None:
+    """Fetch a story along with its (seq_no, primary_term) version token."""
+    try:
+        result = es.get(index=STORIES_INDEX, id=story_id)
+        return Story.model_validate(result["_source"]), result["_seq_no"], result["_primary_term"]
+    except Exception:
+        return None
+
+
+def list_stories(
+    es: Elasticsearch,
+    status: str | None = None,
+    size: int = 50,
+    fields: list[str] | None = None,
+) -> list[Story]:
+    """List stories, newest first. Pass fields to fetch only those source fields."""
     query: dict = {"match_all": {}} if status is None else {"term": {"status": status}}
     try:
         result = es.search(
@@ -41,23 +127,41 @@ def list_stories(es: Elasticsearch, status: str | None = None, size: int = 50) -
             query=query,
             sort=[{"updated_at": {"order": "desc"}}],
             size=size,
+            source_includes=fields,
+            track_total_hits=False,
+            filter_path=_HITS_SOURCE,
         )
-        return [Story.model_validate(hit["_source"]) for hit in result["hits"]["hits"]]
+        return [Story.model_validate(src) for src in _hit_sources(result)]
     except Exception:
         return []
 
 
 def list_in_progress_stories(es: Elasticsearch, size: int = 200) -> list[Story]:
-    """Return all non-PUBLISHED stories, oldest first (for restart recovery)."""
+    """Return all non-PUBLISHED stories, oldest first (for restart recovery).
+
+    Pages through the matches size at a time with search_after, so recovery
+    isn't capped at a single page.
+    """
     query = {"bool": {"must_not": [{"term": {"status": "PUBLISHED"}}]}}
+    stories: list[Story] = []
+    search_after = None
     try:
-        result = es.search(
-            index=STORIES_INDEX,
-            query=query,
-            sort=[{"created_at": {"order": "asc"}}],
-            size=size,
-        )
-        return [Story.model_validate(hit["_source"]) for hit in result["hits"]["hits"]]
+        while True:
+            result = es.search(
+                index=STORIES_INDEX,
+                query=query,
+                # story_id breaks created_at ties so search_after never skips a story
+                sort=[{"created_at": {"order": "asc"}}, {"story_id": {"order": "asc"}}],
+                size=size,
+                search_after=search_after,
+                track_total_hits=False,
+                filter_path="hits.hits._source,hits.hits.sort",
+            )
+            hits = result.body.get("hits", {}).get("hits", [])
+            stories.extend(Story.model_validate(hit["_source"]) for hit in hits)
+            if len(hits) < size:
+                return stories
+            search_after = hits[-1]["sort"]
     except Exception:
         logger.error("list_in_progress_stories_failed")
         return []
@@ -69,11 +173,11 @@ def get_pipeline_counts(es: Elasticsearch) -> dict[str, int]:
             index=STORIES_INDEX,
             size=0,
             aggs={"by_status": {"terms": {"field": "status", "size": 20}}},
+            track_total_hits=False,
+            filter_path="aggregations.by_status.buckets",
         )
-        return {
-            bucket["key"]: bucket["doc_count"]
-            for bucket in result["aggregations"]["by_status"]["buckets"]
-        }
+        buckets = result.body.get("aggregations", {}).get("by_status", {}).get("buckets", [])
+        return {bucket["key"]: bucket["doc_count"] for bucket in buckets}
     except Exception:
         return {}
 
@@ -81,7 +185,75 @@ def get_pipeline_counts(es: Elasticsearch) -> dict[str, int]:
 # --- Activity Logs ---
 
 def log_activity(es: Elasticsearch, log: ActivityLog) -> None:
-    es.index(index=ACTIVITY_LOGS_INDEX, document=log.model_dump(mode="json"))
+    # OrjsonSerializer encodes the dataclass directly
+    es.index(index=ACTIVITY_LOGS_INDEX, document=log)
+
+
+class ActivityLogBuffer:
+    """Queue activity logs and index them with the bulk API from a daemon thread.
+
+    A batch is flushed once it reaches chunk_size entries or flush_interval
+    seconds after its first entry, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        es: Elasticsearch,
+        max_size: int = 10_000,
+        chunk_size: int = 100,
+        flush_interval: float = 1.0,
+    ):
+        self._es = es
+        self._chunk_size = chunk_size
+        self._flush_interval = flush_interval
+        self._queue: queue.Queue[ActivityLog | None] = queue.Queue(maxsize=max_size)
+        self._thread = threading.Thread(target=self._run, name="activity-log-buffer", daemon=True)
+        self._thread.start()
+
+    def add(self, log: ActivityLog) -> None:
+        try:
+            self._queue.put_nowait(log)
+        except queue.Full:
+            logger.warning("activity_log_dropped", action=log.action, story_id=log.story_id)
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Flush everything queued so far and stop the writer thread."""
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        closed = False
+        while not closed:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.monotonic() + self._flush_interval
+            while len(batch) < self._chunk_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    closed = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+
+    def _flush(self, batch: list[ActivityLog]) -> None:
+        actions = (
+            {"_index": ACTIVITY_LOGS_INDEX, "_source": log}
+            for log in batch
+        )
+        try:
+            _, errors = bulk(self._es, actions, max_chunk_bytes=5 * 1024 * 1024, raise_on_error=False)
+            if errors:
+                logger.error("activity_log_bulk_errors", failed=len(errors))
+        except Exception:
+            logger.error("activity_log_bulk_failed", count=len(batch))
 
 
 def get_activity_logs(es: Elasticsearch, size: int = 100) -> list[ActivityLog]:
@@ -91,8 +263,10 @@ def get_activity_logs(es: Elasticsearch, size: int = 100) -> list[ActivityLog]:
             query={"match_all": {}},
             sort=[{"timestamp": {"order": "desc"}}],
             size=size,
+            track_total_hits=False,
+            filter_path=_HITS_SOURCE,
         )
-        return [ActivityLog.model_validate(hit["_source"]) for hit in result["hits"]["hits"]]
+        return [ActivityLog.from_dict(src) for src in _hit_sources(result)]
     except Exception:
         return []
 
@@ -120,8 +294,10 @@ def list_anthologies(es: Elasticsearch, size: int = 50) -> list[Anthology]:
             query={"match_all": {}},
             sort=[{"updated_at": {"order": "desc"}}],
             size=size,
+            track_total_hits=False,
+            filter_path=_HITS_SOURCE,
         )
-        return [Anthology.model_validate(hit["_source"]) for hit in result["hits"]["hits"]]
+        return [Anthology.model_validate(src) for src in _hit_sources(result)]
     except Exception:
         return []
 
@@ -1,21 +1,36 @@
 import logging
 import sys
 
+import orjson
 import structlog
 
 
-def setup_logging(agent_name: str = "unknown") -> structlog.stdlib.BoundLogger:
+def setup_logging(agent_name: str = "unknown") -> structlog.typing.FilteringBoundLogger:
+    if sys.stderr.isatty():
+        renderer = [structlog.dev.ConsoleRenderer()]
+        logger_factory = structlog.PrintLoggerFactory()
+    else:
+        # ConsoleRenderer formats exc_info itself; JSON output needs it rendered first.
+        # orjson renders straight to bytes, which BytesLogger writes without re-encoding.
+        renderer = [
+            structlog.processors.format_exc_info,
+            structlog.processors.JSONRenderer(serializer=orjson.dumps),
+        ]
+        logger_factory = structlog.BytesLoggerFactory()
     structlog.configure(
         processors=[
             structlog.contextvars.merge_contextvars,
             structlog.processors.add_log_level,
             structlog.processors.TimeStamper(fmt="iso"),
-            structlog.dev.ConsoleRenderer() if sys.stderr.isatty() else structlog.processors.JSONRenderer(),
+            *renderer,
         ],
-        wrapper_class=structlog.stdlib.BoundLogger,
+        # Filters below INFO at bind time and never touches the stdlib logging machinery
+        wrapper_class=structlog.make_filtering_bound_logger(logging.INFO),
         context_class=dict,
-        logger_factory=structlog.PrintLoggerFactory(),
+        logger_factory=logger_factory,
         cache_logger_on_first_use=True,
     )
-    logging.basicConfig(format="%(message)s", stream=sys.stdout, level=logging.INFO)
+    # Only third-party libraries log through the stdlib; their per-request INFO
+    # chatter (httpx, elastic_transport) isn't worth a handler dispatch per call.
+    logging.basicConfig(format="%(message)s", stream=sys.stdout, level=logging.WARNING)
     return structlog.get_logger(agent=agent_name)
@@ -1,11 +1,24 @@
 from __future__ import annotations
 
-import uuid
+import secrets
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from enum import Enum
 from typing import Any
 
-from pydantic import BaseModel, Field
+import orjson
+from pydantic import BaseModel, Field, PrivateAttr
+
+_UTC = timezone.utc
+
+
+def _utcnow() -> datetime:
+    return datetime.now(_UTC)
+
+
+def _short_id() -> str:
+    """12 hex chars, same shape as uuid4().hex[:12] without building a UUID."""
+    return secrets.token_hex(6)
 
 
 class StoryStatus(str, Enum):
@@ -39,7 +52,7 @@ class AgentMetrics(BaseModel):
     prompt_tokens: int = 0
     completion_tokens: int = 0
     total_tokens: int = 0
-    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp: datetime = Field(default_factory=_utcnow)
 
 
 class WritingPrompt(BaseModel):
@@ -56,18 +69,19 @@ class FeedbackItem(BaseModel):
     round_number: int
     feedback: str
     approved: bool = False
-    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp: datetime = Field(default_factory=_utcnow)
 
 
 class Revision(BaseModel):
     round_number: int
     content: str
     feedback_addressed: str = ""
-    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    diff_html: str = ""  # word diff against the previous revision, rendered at write time
+    timestamp: datetime = Field(default_factory=_utcnow)
 
 
 class Story(BaseModel):
-    story_id: str = Field(default_factory=lambda: uuid.uuid4().hex[:12])
+    story_id: str = Field(default_factory=_short_id)
     title: str = ""
     model: str = ""
     status: StoryStatus = StoryStatus.PROMPT_CREATED
@@ -84,32 +98,77 @@ class Story(BaseModel):
     total_completion_tokens: int = 0
     total_tokens: int = 0
     trigger_payload: dict[str, Any] = Field(default_factory=dict)
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-
-
-class AgentMessage(BaseModel):
-    message_id: str = Field(default_factory=lambda: uuid.uuid4().hex[:12])
+    created_at: datetime = Field(default_factory=_utcnow)
+    updated_at: datetime = Field(default_factory=_utcnow)
+
+    # (round_number, agent) -> first matching FeedbackItem; rebuilt when feedback grows
+    _feedback_index: dict[tuple[int, str], FeedbackItem] = PrivateAttr(default_factory=dict)
+    _feedback_indexed: int = PrivateAttr(default=0)
+
+    def get_feedback(self, round_number: int, agent: str) -> FeedbackItem | None:
+        if self._feedback_indexed != len(self.feedback):
+            index: dict[tuple[int, str], FeedbackItem] = {}
+            for item in self.feedback:
+                index.setdefault((item.round_number, item.agent), item)
+            self._feedback_index = index
+            self._feedback_indexed = len(self.feedback)
+        return self._feedback_index.get((round_number, agent))
+
+
+class _JsonRecord:
+    """orjson (de)serialization for the internal dataclass records below.
+
+    These are produced and consumed only by our own agents, so they skip
+    pydantic validation; orjson serializes dataclasses and datetimes natively.
+    Decoding still fails on a missing required field or a malformed value, so
+    callers reading from a queue must handle a record that won't decode.
+    """
+
+    __slots__ = ()
+
+    def to_json(self) -> bytes:
+        return orjson.dumps(self)
+
+    @classmethod
+    def from_json(cls, raw: bytes | str):
+        return cls.from_dict(orjson.loads(raw))
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]):
+        # Tolerate what the pydantic models did: unknown keys are dropped, a missing timestamp defaults
+        fields = {k: v for k, v in data.items() if k in cls.__dataclass_fields__}
+        timestamp = fields.pop("timestamp", None)
+        if timestamp is not None:
+            fields["timestamp"] = datetime.fromisoformat(timestamp)
+        return cls(**fields)
+
+
+@dataclass(slots=True, kw_only=True)
+class AgentMessage(_JsonRecord):
+    message_id: str = field(default_factory=_short_id)
     story_id: str = ""
     action: str
-    payload: dict[str, Any] = Field(default_factory=dict)
+    payload: dict[str, Any] = field(default_factory=dict)
     source: str = ""
     target: str = ""
-    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp: datetime = field(default_factory=_utcnow)
 
 
-class ActivityLog(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class ActivityLog(_JsonRecord):
     agent_name: str
     story_id: str = ""
     action: str
     detail: str = ""
-    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    round_number: int | None = None
+    approved: bool | None = None
+    timestamp: datetime = field(default_factory=_utcnow)
 
 
 class Anthology(BaseModel):
-    anthology_id: str = Field(default_factory=lambda: uuid.uuid4().hex[:12])
+    anthology_id: str = Field(default_factory=_short_id)
     title: str = ""
     description: str = ""
     story_ids: list[str] = Field(default_factory=list)
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=_utcnow)
+    updated_at: datetime = Field(default_factory=_utcnow)
@@ -1,54 +1,149 @@
 from __future__ import annotations
 
+import atexit
+import hashlib
 import re
+import time
+from functools import cache
 
 import httpx
+import orjson
 import structlog
-from tenacity import retry, stop_after_attempt, wait_fixed, retry_if_exception_type
 
 from shared.config_loader import load_pipeline_config
 from shared.models import GenerateResult, OllamaUsage
+from shared.redis_client import get_redis_client
 
 logger = structlog.get_logger()
 
+_CACHE_PREFIX = "llmcache:"
+_CACHE_TTL = 86400  # seconds
 
+_THINK_RE = re.compile(r"<think>.*?</think>", re.DOTALL)
+
+
+@cache
 def _get_ollama_config() -> dict:
     return load_pipeline_config()["ollama"]
 
 
+@cache
+def _get_http_client() -> httpx.Client:
+    """Return the process-wide Ollama HTTP client; keep-alive connections are reused across calls."""
+    client = httpx.Client(
+        timeout=_get_ollama_config()["timeout"],
+        limits=httpx.Limits(max_keepalive_connections=8, max_connections=16),
+    )
+    atexit.register(client.close)
+    return client
+
+
 def _strip_thinking_tags(text: str) -> str:
     """Remove <think>...</think> blocks from deepseek-r1 output."""
-    return re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL).strip()
-
-
-@retry(
-    stop=stop_after_attempt(3),
-    wait=wait_fixed(5),
-    retry=retry_if_exception_type((httpx.HTTPError, httpx.TimeoutException)),
-    before_sleep=lambda retry_state: logger.warning(
-        "ollama_retry", attempt=retry_state.attempt_number
-    ),
-)
-def generate(prompt: str, system_prompt: str = "", model: str = "") -> GenerateResult:
+    return _THINK_RE.sub("", text).strip()
+
+
+def _cache_key(model: str, system_prompt: str, prompt: str, temperature: float | None) -> str | None:
+    """Exact-match cache key, or None when sampling makes the output non-deterministic."""
+    if temperature != 0:
+        return None
+    raw = orjson.dumps(
+        {"model": model, "sys": system_prompt, "usr": prompt, "t": temperature},
+        option=orjson.OPT_SORT_KEYS,
+    )
+    return _CACHE_PREFIX + hashlib.sha256(raw).hexdigest()
+
+
+def _cache_get(key: str) -> GenerateResult | None:
+    try:
+        raw = get_redis_client().get(key)
+    except Exception:
+        logger.warning("llm_cache_get_failed")
+        return None
+    if raw is None:
+        return None
+    # No tokens were spent on a hit, so report zero usage to keep story metrics honest
+    return GenerateResult(text=GenerateResult.model_validate_json(raw).text)
+
+
+def _cache_put(key: str, result: GenerateResult) -> None:
+    try:
+        get_redis_client().setex(key, _CACHE_TTL, result.model_dump_json())
+    except Exception:
+        logger.warning("llm_cache_put_failed")
+
+
+def generate(
+    prompt: str,
+    system_prompt: str = "",
+    model: str = "",
+    temperature: float | None = None,
+) -> GenerateResult:
     config = _get_ollama_config()
+    model = model or config["model"]
+    if temperature is None:
+        temperature = config.get("temperature")
+
+    key = _cache_key(model, system_prompt, prompt, temperature)
+    if key is not None:
+        cached = _cache_get(key)
+        if cached is not None:
+            logger.info("llm_cache_hit", model=model)
+            return cached
+
+    result = _generate(config, prompt, system_prompt, model, temperature)
+    if key is not None:
+        _cache_put(key, result)
+    return result
+
+
+def _generate(
+    config: dict,
+    prompt: str,
+    system_prompt: str,
+    model: str,
+    temperature: float | None,
+) -> GenerateResult:
+    """Call Ollama, retrying HTTP errors and timeouts up to max_retries attempts in total."""
+    attempts = max(config.get("max_retries", 3), 1)
+    attempt = 1
+    while True:
+        try:
+            return _generate_once(config, prompt, system_prompt, model, temperature)
+        except httpx.HTTPError:  # includes httpx.TimeoutException
+            if attempt >= attempts:
+                raise
+            logger.warning("ollama_retry", attempt=attempt)
+            time.sleep(config.get("retry_wait", 5))
+            attempt += 1
+
+
+def _generate_once(
+    config: dict,
+    prompt: str,
+    system_prompt: str,
+    model: str,
+    temperature: float | None,
+) -> GenerateResult:
     url = f"{config['base_url']}/api/generate"
 
     payload = {
-        "model": model or config["model"],
+        "model": model,
         "prompt": prompt,
         "stream": False,
     }
     if system_prompt:
         payload["system"] = system_prompt
+    if temperature is not None:
+        payload["options"] = {"temperature": temperature}
 
-    with httpx.Client(timeout=config["timeout"]) as client:
-        response = client.post(url, json=payload)
-        response.raise_for_status()
-        result = response.json()
-        raw_text = result.get("response", "")
-        usage = OllamaUsage(
-            prompt_tokens=result.get("prompt_eval_count", 0),
-            completion_tokens=result.get("eval_count", 0),
-            total_tokens=result.get("prompt_eval_count", 0) + result.get("eval_count", 0),
-        )
-        return GenerateResult(text=_strip_thinking_tags(raw_text), usage=usage)
+    response = _get_http_client().post(url, json=payload)
+    response.raise_for_status()
+    result = response.json()
+    raw_text = result.get("response", "")
+    usage = OllamaUsage(
+        prompt_tokens=result.get("prompt_eval_count", 0),
+        completion_tokens=result.get("eval_count", 0),
+        total_tokens=result.get("prompt_eval_count", 0) + result.get("eval_count", 0),
+    )
+    return GenerateResult(text=_strip_thinking_tags(raw_text), usage=usage)
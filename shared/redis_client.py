@@ -1,47 +1,270 @@
 from __future__ import annotations
 
-import json
+import itertools
+from functools import cache
 
 import redis
+import redis.asyncio
 import structlog
 
 from shared.config_loader import load_pipeline_config
-from shared.constants import ACTIVITY_CHANNEL, ACTIVITY_LOG_KEY
+from shared.constants import ACTIVITY_CHANNEL, ACTIVITY_LOG_KEY, DEAD_LETTER_MAXLEN, QUEUE_DEAD_LETTER
 from shared.models import ActivityLog, AgentMessage
 
 logger = structlog.get_logger()
 
+# The activity list may overshoot its 1000-entry cap by this many entries between trims
+_ACTIVITY_TRIM_EVERY = 50
+_activity_pushes = itertools.count()
 
-def get_redis_client() -> redis.Redis:
+
+@cache
+def get_redis_client(binary: bool = False) -> redis.Redis:
+    """Return the process-wide Redis client; all callers share one connection pool.
+
+    Pass binary=True for a client that returns raw bytes (e.g. cached PDFs).
+    """
+    config = load_pipeline_config()["redis"]
+    pool = redis.ConnectionPool(
+        host=config["host"],
+        port=config["port"],
+        db=config["db"],
+        decode_responses=not binary,
+        max_connections=config.get("max_connections", 64),
+        socket_keepalive=True,
+    )
+    return redis.Redis(connection_pool=pool)
+
+
+@cache
+def get_async_redis_client(binary: bool = False) -> redis.asyncio.Redis:
+    """Return the process-wide asyncio Redis client, for use on the dashboard's event loop.
+
+    Pass binary=True for a client that returns raw bytes.
+    """
     config = load_pipeline_config()["redis"]
-    return redis.Redis(
+    return redis.asyncio.Redis(
         host=config["host"],
         port=config["port"],
         db=config["db"],
-        decode_responses=True,
+        decode_responses=not binary,
+        max_connections=config.get("max_connections", 64),
+        socket_keepalive=True,
     )
 
 
+def _stream_fields(message: AgentMessage) -> dict[str, bytes]:
+    return {"msg": message.to_json()}
+
+
 def enqueue_message(client: redis.Redis, queue: str, message: AgentMessage) -> None:
-    client.lpush(queue, message.model_dump_json())
+    client.xadd(queue, _stream_fields(message))
     logger.info("message_enqueued", queue=queue, action=message.action, story_id=message.story_id)
 
 
-def dequeue_message(client: redis.Redis, queue: str, timeout: int = 30) -> AgentMessage | None:
-    result = client.brpop(queue, timeout=timeout)
-    if result is None:
-        return None
-    _, raw = result
-    return AgentMessage.model_validate_json(raw)
+async def enqueue_message_async(client: redis.asyncio.Redis, queue: str, message: AgentMessage) -> None:
+    await client.xadd(queue, _stream_fields(message))
+    logger.info("message_enqueued", queue=queue, action=message.action, story_id=message.story_id)
 
 
-def publish_activity(client: redis.Redis, log: ActivityLog) -> None:
-    data = log.model_dump_json()
+def enqueue_messages(client: redis.Redis, queue: str, messages: list[AgentMessage]) -> None:
+    """Enqueue several messages in a single pipelined round-trip."""
+    pipe = client.pipeline(transaction=False)
+    for message in messages:
+        pipe.xadd(queue, _stream_fields(message))
+    pipe.execute()
+    logger.info("messages_enqueued", queue=queue, count=len(messages))
+
+
+def migrate_legacy_queue(client: redis.Redis, queue: str) -> int:
+    """Convert a pre-Streams LIST queue to a stream in place; returns the messages moved.
+
+    Run once from setup before any agent starts: an XADD to a queue that is still
+    a LIST fails with WRONGTYPE.
+    """
+    if client.type(queue) != "list":
+        return 0
+    legacy = client.lrange(queue, 0, -1)
+    pipe = client.pipeline()
+    pipe.delete(queue)
+    for raw in reversed(legacy):  # LPUSH stored newest first
+        pipe.xadd(queue, {"msg": raw})
+    pipe.execute()
+    logger.info("queue_migrated_to_stream", queue=queue, messages=len(legacy))
+    return len(legacy)
+
+
+def ensure_consumer_group(client: redis.Redis, queue: str, group: str) -> None:
+    try:
+        client.xgroup_create(queue, group, id="0", mkstream=True)
+    except redis.ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+def _decode_entries(
+    client: redis.Redis, queue: str, group: str, entries: list[tuple[str, dict]]
+) -> list[tuple[str, AgentMessage]]:
+    """Decode delivered entries one by one, dead-lettering any that won't decode.
+
+    A single malformed entry must not fail the batch, or it and every entry read
+    alongside it would stay pending and fail again on each retry.
+    """
+    decoded = []
+    for entry_id, fields in entries:
+        # Unacked entries trimmed from the stream come back with no fields
+        if not fields:
+            continue
+        try:
+            decoded.append((entry_id, AgentMessage.from_json(fields["msg"])))
+        except Exception as exc:
+            _dead_letter(client, queue, group, entry_id, {**fields, "error": f"{type(exc).__name__}: {exc}"})
+    return decoded
+
+
+def dequeue_batch(
+    client: redis.Redis,
+    queue: str,
+    group: str,
+    consumer: str,
+    max_n: int = 16,
+    timeout: int = 30,
+) -> list[tuple[str, AgentMessage]]:
+    """Read up to max_n new (entry_id, message) pairs in one XREADGROUP round-trip.
+
+    Blocks up to timeout seconds when the queue is empty.
+    """
+    result = client.xreadgroup(group, consumer, {queue: ">"}, count=max_n, block=timeout * 1000)
+    if not result:
+        return []
+    _, entries = result[0]
+    return _decode_entries(client, queue, group, entries)
+
+
+def ack_message(client: redis.Redis, queue: str, group: str, entry_id: str) -> None:
+    client.xack(queue, group, entry_id)
+
+
+def claim_stale_messages(
+    client: redis.Redis,
+    queue: str,
+    group: str,
+    consumer: str,
+    min_idle_ms: int,
+    count: int = 16,
+) -> list[tuple[str, AgentMessage, int]]:
+    """XAUTOCLAIM every entry left unacked for min_idle_ms by any consumer, count per round-trip.
+
+    Returns (entry_id, message, times_delivered) triples; the claim itself counts
+    as a delivery.
+    """
+    entries = []
+    start = "0-0"
+    while True:
+        start, claimed, *_ = client.xautoclaim(queue, group, consumer, min_idle_ms, start_id=start, count=count)
+        entries += _decode_entries(client, queue, group, claimed)
+        if start == "0-0":
+            break
+    if not entries:
+        return []
+    pipe = client.pipeline(transaction=False)
+    for entry_id, _ in entries:
+        pipe.xpending_range(queue, group, min=entry_id, max=entry_id, count=1)
+    deliveries = [pending[0]["times_delivered"] if pending else 1 for pending in pipe.execute()]
+    return [(entry_id, message, n) for (entry_id, message), n in zip(entries, deliveries)]
+
+
+def _dead_letter(client: redis.Redis, queue: str, group: str, entry_id: str, fields: dict) -> None:
+    pipe = client.pipeline()
+    pipe.xadd(
+        QUEUE_DEAD_LETTER,
+        {**fields, "queue": queue, "group": group, "entry_id": entry_id},
+        maxlen=DEAD_LETTER_MAXLEN,
+        approximate=True,
+    )
+    pipe.xack(queue, group, entry_id)
+    pipe.execute()
+    logger.warning("message_dead_lettered", queue=queue, entry_id=entry_id, error=fields.get("error"))
+
+
+def dead_letter_message(
+    client: redis.Redis, queue: str, group: str, entry_id: str, message: AgentMessage, deliveries: int
+) -> None:
+    """Move an entry to the dead-letter stream and ack it on its queue, in one transaction."""
+    _dead_letter(client, queue, group, entry_id, {**_stream_fields(message), "deliveries": deliveries})
+
+
+def trim_acked(client: redis.Redis, queue: str, group: str) -> None:
+    """Drop entries the group has acked, keeping everything pending or not yet delivered.
+
+    The work queues are never capped by length, which could discard messages
+    nobody has handled; this MINID trim only removes entries below the oldest
+    pending one (or, with none pending, the last delivered one).
+    """
+    pending = client.xpending(queue, group)
+    if pending["pending"]:
+        minid = pending["min"]
+    else:
+        info = next((g for g in client.xinfo_groups(queue) if g["name"] == group), None)
+        if info is None:
+            return
+        minid = info["last-delivered-id"]
+    client.xtrim(queue, minid=minid, approximate=False)
+
+
+def outstanding_story_ids(client: redis.Redis, queue: str, group: str) -> set[str]:
+    """Return the story_ids of entries the group has not acked yet, delivered or not."""
+    if client.type(queue) != "stream":
+        return set()
+    info = next((g for g in client.xinfo_groups(queue) if g["name"] == group), None)
+    if info is None:
+        # The group is created at id 0, so it will receive every entry in the stream
+        entries = client.xrange(queue)
+    else:
+        entries = client.xrange(queue, min=f"({info['last-delivered-id']}")
+        if info["pending"]:
+            pending = client.xpending_range(queue, group, min="-", max="+", count=info["pending"])
+            pipe = client.pipeline(transaction=False)
+            for p in pending:
+                pipe.xrange(queue, min=p["message_id"], max=p["message_id"])
+            entries += [entry for found in pipe.execute() for entry in found]
+    story_ids = set()
+    for entry_id, fields in entries:
+        if not fields:
+            continue
+        try:
+            story_ids.add(AgentMessage.from_json(fields["msg"]).story_id)
+        except Exception:
+            # Left for the group's own consumer, which dead-letters it when read
+            logger.warning("undecodable_queue_entry", queue=queue, entry_id=entry_id)
+    return story_ids
+
+
+def _queue_activity(client: redis.Redis | redis.client.Pipeline, log: ActivityLog) -> None:
+    # The bytes go to Redis as-is, skipping the str round-trip
+    data = log.to_json()
     client.lpush(ACTIVITY_LOG_KEY, data)
-    client.ltrim(ACTIVITY_LOG_KEY, 0, 999)  # keep last 1000
+    if next(_activity_pushes) % _ACTIVITY_TRIM_EVERY == 0:
+        client.ltrim(ACTIVITY_LOG_KEY, 0, 999)  # keep last 1000
     client.publish(ACTIVITY_CHANNEL, data)
 
 
+def publish_activity(client: redis.Redis, log: ActivityLog) -> None:
+    """Push and broadcast an activity entry in a single pipelined round-trip."""
+    pipe = client.pipeline(transaction=False)
+    _queue_activity(pipe, log)
+    pipe.execute()
+
+
+def publish_and_enqueue(client: redis.Redis, log: ActivityLog, queue: str, message: AgentMessage) -> None:
+    """Publish an activity entry and enqueue a message in a single pipelined round-trip."""
+    pipe = client.pipeline(transaction=False)
+    _queue_activity(pipe, log)
+    pipe.xadd(queue, _stream_fields(message))
+    pipe.execute()
+    logger.info("message_enqueued", queue=queue, action=message.action, story_id=message.story_id)
+
+
 def get_recent_activity(client: redis.Redis, count: int = 50) -> list[ActivityLog]:
     raw_items = client.lrange(ACTIVITY_LOG_KEY, 0, count - 1)
-    return [ActivityLog.model_validate_json(item) for item in raw_items]
+    return [ActivityLog.from_json(item) for item in raw_items]
@@ -3,35 +3,85 @@ from __future__ import annotations
 
 import re
 import xml.etree.ElementTree as ET
+from operator import itemgetter
 
 _SVG_NS = "http://www.w3.org/2000/svg"
 _MAX_FONT_SIZE = 48
+_MAX_FONT_SIZE_ATTR = str(_MAX_FONT_SIZE)
 _MAX_CHARS_PER_LINE = 20
 _SANITIZED_ATTR = "data-sanitized"
+_SANITIZED_MARK = f'{_SANITIZED_ATTR}="1"'
+_XMLNS_ATTR = f'xmlns="{_SVG_NS}"'
+_DEFAULT_FONT_SIZE = 24.0
+
+_SVG_OPEN_RE = re.compile(r"<svg([^>]*?)>", re.DOTALL)
+_VIEWBOX_RE = re.compile(r'viewBox="(\d[\d\s.]+)"')
+_NON_NUMERIC_RE = re.compile(r"[^\d.]")
 
 
 def sanitize_svg(svg: str) -> str:
     """Fix common LLM issues in SVG markup: broken tags, text overflow, etc."""
+    # Already-sanitized SVGs come back unchanged; spot them from the open tag
+    # alone, without an XML parse, whatever order its attributes are in
+    open_match = _SVG_OPEN_RE.match(svg)
+    if open_match:
+        attrs_raw = open_match.group(1)
+        if _SANITIZED_MARK in attrs_raw and _is_clean_open_tag(attrs_raw):
+            return svg
     svg = _fix_svg_open_tag(svg)
     svg = _fix_text_elements(svg)
     return svg
 
 
+def _is_clean_open_tag(attrs_raw: str) -> bool:
+    """True if the <svg> attributes already carry the xmlns and a numeric viewBox."""
+    return _XMLNS_ATTR in attrs_raw and _VIEWBOX_RE.search(attrs_raw) is not None
+
+
 def _fix_svg_open_tag(svg: str) -> str:
-    svg_open_match = re.match(r"<svg([^>]*?)>", svg, re.DOTALL)
+    svg_open_match = _SVG_OPEN_RE.match(svg)
     if not svg_open_match:
         return svg
     attrs_raw = svg_open_match.group(1)
-    has_valid_xmlns = 'xmlns="http://www.w3.org/2000/svg"' in attrs_raw
-    vb_match = re.search(r'viewBox="(\d[\d\s.]+)"', attrs_raw)
-    if has_valid_xmlns and vb_match:
+    if _is_clean_open_tag(attrs_raw):
         return svg
+    vb_match = _VIEWBOX_RE.search(attrs_raw)
     viewbox = vb_match.group(1) if vb_match else "0 0 600 900"
-    clean_open = f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="{viewbox}">'
+    clean_open = f'<svg {_XMLNS_ATTR} viewBox="{viewbox}">'
     body = svg[svg_open_match.end():]
     return clean_open + body
 
 
+def _parse_size(raw: str) -> float:
+    """Parse a font-size like "24px", falling back to the default size."""
+    try:
+        return float(_NON_NUMERIC_RE.sub("", raw))
+    except ValueError:
+        return _DEFAULT_FONT_SIZE
+
+
+def _wrap_words(words: list[str]) -> list[str]:
+    """Greedily pack words into lines of at most _MAX_CHARS_PER_LINE characters.
+
+    A single word longer than the limit gets a line of its own.
+    """
+    lines: list[str] = []
+    line: list[str] = []
+    line_len = 0
+    for word in words:
+        added = len(word) + 1 if line else len(word)
+        if line and line_len + added > _MAX_CHARS_PER_LINE:
+            lines.append(" ".join(line))
+            line = [word]
+            line_len = len(word)
+        else:
+            line.append(word)
+            line_len += added
+    if line:
+        lines.append(" ".join(line))
+    return lines
+
+
 def _fix_text_elements(svg: str) -> str:
     """Center text, clamp font sizes, wrap long text, and prevent overlaps."""
     try:
@@ -51,37 +101,31 @@ def _fix_text_elements(svg: str) -> str:
     except (IndexError, ValueError):
         vb_height = 900.0
 
-    text_els = list(root.iter(f"{{{_SVG_NS}}}text"))
-    def _get_y(el: ET.Element) -> float:
+    # One pass over the <text> elements, parsing each y once. A missing or
+    # malformed y sorts first but is laid out at y=400.
+    entries: list[tuple[float, float, ET.Element]] = []
+    for el in root.iter(f"{{{_SVG_NS}}}text"):
         try:
-            return float(el.get("y", "0"))
+            y = float(el.get("y", ""))
+            entries.append((y, y, el))
         except ValueError:
-            return 0.0
-    text_els.sort(key=_get_y)
+            entries.append((0.0, 400.0, el))
+    entries.sort(key=itemgetter(0))
 
     y_shift = 0.0  # cumulative downward shift from prior wraps
 
-    for text_el in text_els:
+    for _, orig_y, text_el in entries:
         text_el.set("text-anchor", "middle")
         for attr in ("alignment-baseline", "dominant-baseline"):
             if attr in text_el.attrib:
                 del text_el.attrib[attr]
 
-        raw_size = text_el.get("font-size", "24")
-        try:
-            size = float(re.sub(r"[^\d.]", "", raw_size))
-        except ValueError:
-            size = 24
+        size = _parse_size(text_el.get("font-size", "24"))
         if size > _MAX_FONT_SIZE:
             size = _MAX_FONT_SIZE
-            text_el.set("font-size", str(int(size)))
+            text_el.set("font-size", _MAX_FONT_SIZE_ATTR)
 
         # Apply accumulated shift from previous wraps, clamped to viewBox
-        y_str = text_el.get("y", "400")
-        try:
-            orig_y = float(y_str)
-        except ValueError:
-            orig_y = 400
         adjusted_y = min(orig_y + y_shift, vb_height - size)
 
         full_text = (text_el.text or "").strip()
@@ -96,13 +140,8 @@ def _fix_text_elements(svg: str) -> str:
             for tspan in existing_tspans:
                 tspan.set("text-anchor", "middle")
                 tspan_size = tspan.get("font-size", "")
-                if tspan_size:
-                    try:
-                        ts = float(re.sub(r"[^\d.]", "", tspan_size))
-                        if ts > _MAX_FONT_SIZE:
-                            tspan.set("font-size", str(int(_MAX_FONT_SIZE)))
-                    except ValueError:
-                        pass
+                if tspan_size and _parse_size(tspan_size) > _MAX_FONT_SIZE:
+                    tspan.set("font-size", _MAX_FONT_SIZE_ATTR)
             # Apply prior shift to this element, then accumulate for next
             if y_shift:
                 text_el.set("y", str(int(adjusted_y)))
@@ -128,35 +167,26 @@ def _fix_text_elements(svg: str) -> str:
         x = text_el.get("x", "300")
         line_height = size * 1.3
 
-        words = full_text.split()
-        lines: list[str] = []
-        current = ""
-        for word in words:
-            test = f"{current} {word}".strip()
-            if len(test) > _MAX_CHARS_PER_LINE and current:
-                lines.append(current)
-                current = word
-            else:
-                current = test
-        if current:
-            lines.append(current)
+        lines = _wrap_words(full_text.split())
 
         # First line stays at adjusted_y; extra lines push everything below down
         extra_lines = len(lines) - 1
         y_shift += extra_lines * line_height
 
+        y_attr = str(int(adjusted_y))
+        dy_attr = str(line_height)
         text_el.text = None
-        text_el.set("y", str(int(adjusted_y)))
+        text_el.set("y", y_attr)
         for child in list(text_el):
             text_el.remove(child)
         for i, line in enumerate(lines):
             tspan = ET.SubElement(text_el, f"{{{_SVG_NS}}}tspan")
             tspan.set("x", x)
             if i == 0:
-                tspan.set("y", str(int(adjusted_y)))
+                tspan.set("y", y_attr)
                 tspan.set("dy", "0")
             else:
-                tspan.set("dy", str(line_height))
+                tspan.set("dy", dy_attr)
             tspan.text = line
 
     # Mark as sanitized so subsequent calls are no-ops
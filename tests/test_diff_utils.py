@@ -0,0 +1,17 @@
+from shared.diff_utils import word_diff
+
+
+def test_one_word_substitution_is_a_single_del_ins_pair():
+    html = word_diff("the quick brown fox jumps over", "the quick brown fox leaps over")
+    assert html == "the quick brown fox <del>jumps</del> <ins>leaps</ins> over"
+
+
+def test_adjacent_changes_merge_into_one_span():
+    # Levenshtein alone renders this as <ins>leaps</ins> <del>jumps</del> <ins>high</ins>
+    html = word_diff("the fox jumps", "the fox leaps high")
+    assert html == "the fox <del>jumps</del> <ins>leaps high</ins>"
+
+
+def test_pure_insert_and_delete():
+    assert word_diff("a b", "a x b") == "a <ins>x</ins> b"
+    assert word_diff("a x b", "a b") == "a <del>x</del> b"
@@ -0,0 +1,17 @@
+from datetime import datetime
+
+from shared.models import ActivityLog, AgentMessage
+
+
+def test_round_trip():
+    msg = AgentMessage(story_id="s1", action="review", payload={"round": 2})
+    assert AgentMessage.from_json(msg.to_json()) == msg
+
+
+def test_missing_timestamp_defaults_and_unknown_keys_are_ignored():
+    msg = AgentMessage.from_json(b'{"action": "review", "story_id": "s1", "priority": 5}')
+    assert msg.story_id == "s1"
+    assert isinstance(msg.timestamp, datetime)
+
+    log = ActivityLog.from_dict({"agent_name": "writer", "action": "x", "timestamp": None, "extra": 1})
+    assert isinstance(log.timestamp, datetime)
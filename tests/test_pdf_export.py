@@ -0,0 +1,63 @@
+import io
+import re
+
+from PIL import Image
+
+from dashboard import pdf_export
+from dashboard.pdf_export import BookPDF
+from shared.models import Story
+
+# fpdf2 parses this fine except for the rgba() fill, which it rejects
+_RGBA_COVER = (
+    '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 600 900">'
+    '<rect width="600" height="900" fill="rgba(10, 20, 30, 0.5)"/></svg>'
+)
+
+
+def _png() -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", (6, 9), "navy").save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def test_unsupported_svg_without_cairosvg_adds_no_page(monkeypatch):
+    monkeypatch.setattr(pdf_export, "_HAS_CAIROSVG", False)
+    pdf = BookPDF()
+    assert pdf._cover_page(_RGBA_COVER) is False
+    assert pdf.page_no() == 0
+
+
+def test_unsupported_svg_falls_back_to_raster_on_one_page(monkeypatch):
+    rasterized = []
+
+    def fake_rasterize(svg):
+        rasterized.append(svg)
+        return _png()
+
+    monkeypatch.setattr(pdf_export, "_HAS_CAIROSVG", True)
+    monkeypatch.setattr(pdf_export, "_rasterize_cover", fake_rasterize)
+    pdf = BookPDF()
+    assert pdf._cover_page(_RGBA_COVER) is True
+    assert pdf.page_no() == 1
+    assert len(rasterized) == 1
+
+
+def test_supported_svg_is_embedded_as_vector(monkeypatch):
+    monkeypatch.setattr(pdf_export, "_HAS_CAIROSVG", False)
+    pdf = BookPDF()
+    assert pdf._cover_page(_RGBA_COVER.replace("rgba(10, 20, 30, 0.5)", "rgb(10, 20, 30)")) is True
+    assert pdf.page_no() == 1
+
+
+def test_story_pdf_with_unsupported_cover_has_one_cover_page(monkeypatch):
+    monkeypatch.setattr(pdf_export, "_HAS_CAIROSVG", True)
+    monkeypatch.setattr(pdf_export, "_rasterize_cover", lambda svg: _png())
+    title_pages = []
+    monkeypatch.setattr(BookPDF, "_title_page", lambda self, **kw: title_pages.append(kw))
+
+    story = Story(title="Lighthouse", current_draft="It was dark.", cover_svg=_RGBA_COVER)
+    out = pdf_export.generate_single_story_pdf(story)
+
+    # Cover + first chapter page; no blank page and no text title page
+    assert len(re.findall(rb"/Type /Page\b", out)) == 2
+    assert title_pages == []
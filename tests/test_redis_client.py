@@ -0,0 +1,89 @@
+import fakeredis
+import pytest
+
+from shared.constants import QUEUE_DEAD_LETTER
+from shared.models import AgentMessage
+from shared.redis_client import (
+    claim_stale_messages,
+    dead_letter_message,
+    dequeue_batch,
+    enqueue_message,
+    ensure_consumer_group,
+    migrate_legacy_queue,
+    outstanding_story_ids,
+    trim_acked,
+)
+
+QUEUE = "queue:test"
+GROUP = "writer"
+
+
+@pytest.fixture
+def client():
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+def _msg(story_id: str) -> AgentMessage:
+    return AgentMessage(story_id=story_id, action="write_draft", source="test")
+
+
+def test_migrate_legacy_queue_keeps_fifo_order(client):
+    for story_id in ("a", "b", "c"):
+        client.lpush(QUEUE, _msg(story_id).to_json())
+
+    assert migrate_legacy_queue(client, QUEUE) == 3
+    assert client.type(QUEUE) == "stream"
+    ensure_consumer_group(client, QUEUE, GROUP)
+    assert [m.story_id for _, m in dequeue_batch(client, QUEUE, GROUP, "c1", timeout=0)] == ["a", "b", "c"]
+    assert migrate_legacy_queue(client, QUEUE) == 0
+
+
+def test_claim_counts_deliveries_and_dead_letter_acks(client):
+    ensure_consumer_group(client, QUEUE, GROUP)
+    enqueue_message(client, QUEUE, _msg("a"))
+    [(entry_id, _)] = dequeue_batch(client, QUEUE, GROUP, "c1", timeout=0)
+
+    [(claimed_id, message, deliveries)] = claim_stale_messages(client, QUEUE, GROUP, "c2", 0)
+    assert (claimed_id, message.story_id, deliveries) == (entry_id, "a", 2)
+
+    dead_letter_message(client, QUEUE, GROUP, entry_id, message, deliveries)
+    assert client.xpending(QUEUE, GROUP)["pending"] == 0
+    [(_, fields)] = client.xrange(QUEUE_DEAD_LETTER)
+    assert fields["queue"] == QUEUE and fields["entry_id"] == entry_id
+    assert AgentMessage.from_json(fields["msg"]).story_id == "a"
+
+
+def test_outstanding_story_ids_covers_pending_and_undelivered(client):
+    ensure_consumer_group(client, QUEUE, GROUP)
+    for story_id in ("acked", "pending", "new"):
+        enqueue_message(client, QUEUE, _msg(story_id))
+    entries = dequeue_batch(client, QUEUE, GROUP, "c1", max_n=2, timeout=0)
+    client.xack(QUEUE, GROUP, entries[0][0])
+
+    assert outstanding_story_ids(client, QUEUE, GROUP) == {"pending", "new"}
+    assert outstanding_story_ids(client, QUEUE, "editor") == {"acked", "pending", "new"}
+    assert outstanding_story_ids(client, "queue:missing", GROUP) == set()
+
+
+def test_undecodable_entry_is_dead_lettered_without_blocking_the_batch(client):
+    ensure_consumer_group(client, QUEUE, GROUP)
+    enqueue_message(client, QUEUE, _msg("a"))
+    client.xadd(QUEUE, {"msg": b'{"story_id": "bad"}'})
+    enqueue_message(client, QUEUE, _msg("c"))
+
+    assert outstanding_story_ids(client, QUEUE, GROUP) == {"a", "c"}
+    assert [m.story_id for _, m in dequeue_batch(client, QUEUE, GROUP, "c1", timeout=0)] == ["a", "c"]
+    assert client.xpending(QUEUE, GROUP)["pending"] == 2
+    [(_, fields)] = client.xrange(QUEUE_DEAD_LETTER)
+    assert fields["queue"] == QUEUE and "TypeError" in fields["error"]
+
+
+def test_trim_acked_keeps_pending_and_undelivered_entries(client):
+    ensure_consumer_group(client, QUEUE, GROUP)
+    for story_id in ("acked", "pending", "new"):
+        enqueue_message(client, QUEUE, _msg(story_id))
+    entries = dequeue_batch(client, QUEUE, GROUP, "c1", max_n=2, timeout=0)
+    client.xack(QUEUE, GROUP, entries[0][0])
+
+    trim_acked(client, QUEUE, GROUP)
+    assert [AgentMessage.from_json(f["msg"]).story_id for _, f in client.xrange(QUEUE)] == ["pending", "new"]